@@ -6,14 +6,42 @@ Audio analysis
 '''
 
 import os
+import collections
+import multiprocessing
+from functools import partial
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+    FIRST_COMPLETED,
+)
 import pandas as pd
 import numpy as np
+import scipy.signal
+import six
 import soundfile as sf
 
 import librosa
 
-from .feature import Feature, FeatureCollection
+from .cache import AnalysisCache, load_memmap
+from .exceptions import AudioError
+from .extractors import EXTRACTORS, STREAM_EXTRACTORS, extract
+from .feature import Feature, FeatureCollection, FrameIndex, MatrixFeatureCollection
 from .timing import TimingList
+from .utils import LazyDict
+
+try:
+    from concurrent.futures.process import BrokenProcessPool
+except ImportError:
+
+    class BrokenProcessPool(RuntimeError):
+        """
+        The Python 2 backport of concurrent.futures never reports a broken process pool.
+        """
+
+
+FEATURE_NAMES = ('centroid', 'amplitude', 'timbre', 'chroma', 'tempo', 'onset_strength')
+TIMING_NAMES = ('track', 'beats', 'segments')
 
 
 class Audio(object):
@@ -28,12 +56,24 @@ class Audio(object):
             raw samples from the audio
         analysis_samples: numpy array
             downsampled samples for analysis
+        hop_length: integer
+            number of analysis samples between feature frames
+        n_fft: integer
+            length of each analysis frame, in analysis samples
         num_channels: integer
             number of channels of the audio
         duration: float
             duration, in seconds
-        features: dict
-            collection of named feature objects
+        features: FeatureCollection
+            collection of named feature objects, computed on first access
+        timings: LazyDict
+            collection of named TimingLists, computed on first access
+        feature_names: tuple [strings]
+            names of the features this object provides
+        timing_names: tuple [strings]
+            names of the timings this object provides
+        threads: integer
+            number of threads the analysis runs on, or None to compute it lazily
     """
 
     def __init__(
@@ -43,6 +83,17 @@ class Audio(object):
         convert_to_mono=False,
         sample_rate=44100,
         analysis_sample_rate=22050,
+        cache=None,
+        stream=False,
+        block_size=2**16,
+        mmap_dir=None,
+        res_type='kaiser_best',
+        dtype=None,
+        feature_names=None,
+        timing_names=None,
+        threads=None,
+        offset=0.0,
+        duration=None,
     ):
         """
         Audio constructor.
@@ -63,40 +114,354 @@ class Audio(object):
         sample_rate: number > 0 [scalar]
             (optional) sample rate to pass to librosa.
 
+        analysis_sample_rate: number > 0 [scalar]
+            (optional) sample rate used for feature and timing analysis.
+
+        cache: string or AnalysisCache
+            (optional) directory, or AnalysisCache, to store analysis results in.
+            On a cache hit, features, timings and zero crossings are loaded from disk.
+            On a miss, they are all computed immediately and stored.
+
+        stream: boolean
+            (optional) analyse the file block by block, rather than decoding it into memory.
+            Analysis runs at the file's own sample rate, with a hop length that keeps
+            the usual analysis frame rate.  Chroma is computed from the STFT.
+            Samples are only decoded if `raw_samples` is accessed.  Needs `file_path`.
+
+        block_size: integer > 0
+            (optional) number of samples to read at a time when streaming.
+
+        mmap_dir: string
+            (optional) directory for decoded sample files.
+            If given, the file is decoded once into this directory, and `raw_samples`
+            is a read-only, float32 memory map of it, so only the slices in use are paged in.
+            Decoded files are never removed, so the directory grows without limit.
+
+        res_type: string
+            (optional) resampler used to make `analysis_samples`.
+            'polyphase' is much faster than the default 'kaiser_best', and its filter
+            is shared between Audio objects.  Any other librosa `res_type` is passed on.
+            No resampling is done when `sample_rate` equals `analysis_sample_rate`.
+
+        dtype: numpy dtype
+            (optional) dtype for samples and feature data, for example `np.float32`
+            to halve memory use.  By default, the dtypes librosa returns are kept.
+            Memory-mapped samples are always float32.
+
+        feature_names: list [strings]
+            (optional) the features to provide, out of `FEATURE_NAMES` and the names
+            of custom extractors registered with `amen.extractors.register_extractor`.
+            Defaults to all of `FEATURE_NAMES`.  Other features are never computed.
+
+        timing_names: list [strings]
+            (optional) the timings to provide, out of `TIMING_NAMES`.
+            Defaults to all of them.  Other timings are never computed.
+
+        threads: integer > 0
+            (optional) number of threads to analyse with.  If given, every selected
+            feature and timing is computed during construction, and extractors that
+            do not depend on each other run at the same time.
+
+        offset: number >= 0 [scalar]
+            (optional) start of the window of the file to load, in seconds.
+
+        duration: number > 0 [scalar]
+            (optional) length of the window of the file to load, in seconds.
+            Defaults to the rest of the file.  Only the window is decoded and analysed,
+            but features and timings keep the file's time base, starting at `offset`.
 
         Returns
         ------
         An Audio object
         """
 
-        if file_path:
-            y, sr = librosa.load(file_path, mono=convert_to_mono, sr=sample_rate)
-        elif raw_samples is not None:
-            # This assumes that we're passing in raw_samples
-            # directly from another Audio's raw_samples.
-            y = raw_samples
-            sr = sample_rate
+        self._set_attributes(
+            file_path=file_path,
+            convert_to_mono=convert_to_mono,
+            analysis_sample_rate=analysis_sample_rate,
+            stream=stream,
+            block_size=block_size,
+            mmap_dir=mmap_dir,
+            res_type=res_type,
+            dtype=dtype,
+            feature_names=feature_names,
+            timing_names=timing_names,
+            threads=threads,
+            offset=offset,
+            duration=duration,
+        )
+
+        if stream:
+            if not file_path:
+                raise AudioError('Streaming needs a file_path to read from')
+            info = sf.info(file_path)
+            self.sample_rate = float(sample_rate or info.samplerate)
+            self.num_channels = 1 if convert_to_mono else info.channels
+            _, frames = self._file_window()
+            self.duration = frames / float(info.samplerate)
+            # Analyse at the file's own rate, keeping the analysis frame rate.
+            self.hop_length = int(
+                round(self.hop_length * info.samplerate / self.analysis_sample_rate)
+            )
+            self.n_fft = 4 * self.hop_length
+            self.analysis_sample_rate = float(info.samplerate)
+        else:
+            if file_path and mmap_dir:
+                # sample_rate=None keeps the file's own rate, as librosa does.
+                sr = float(sample_rate or sf.info(file_path).samplerate)
+                y = self._load_memmap(sr)
+                if len(y) == 1:
+                    y = y[0]
+            elif file_path:
+                y, sr = librosa.load(
+                    file_path,
+                    mono=convert_to_mono,
+                    sr=sample_rate,
+                    offset=self.offset,
+                    duration=duration,
+                )
+            elif raw_samples is not None:
+                # This assumes that we're passing in raw_samples
+                # directly from another Audio's raw_samples.
+                y = raw_samples
+                sr = sample_rate
+
+            self.sample_rate = float(sr)
+            self.num_channels = y.ndim
+            self.duration = librosa.get_duration(y=y, sr=sr)
+            self._raw_samples = self._as_raw_samples(y)
+
+        self._analysis = self._create_analysis()
+        self.features = self._create_features()
+        self.timings = self._create_timings()
 
+        if cache is not None:
+            self._load_analysis(cache)
+        elif threads:
+            self._extract_all()
+
+    def _set_attributes(
+        self,
+        file_path=None,
+        convert_to_mono=False,
+        analysis_sample_rate=22050,
+        stream=False,
+        block_size=2**16,
+        mmap_dir=None,
+        res_type='kaiser_best',
+        dtype=None,
+        feature_names=None,
+        timing_names=None,
+        threads=None,
+        offset=0.0,
+        duration=None,
+    ):
+        """
+        Sets every attribute that does not depend on the samples, from the
+        constructor's arguments.  Subclasses that get their samples another way
+        call this too, so that they have the same attributes as an Audio.
+        """
         self.file_path = file_path
-        self.sample_rate = float(sr)
+        self.convert_to_mono = convert_to_mono
         self.analysis_sample_rate = float(analysis_sample_rate)
-        self.num_channels = y.ndim
-        self.duration = librosa.get_duration(y=y, sr=sr)
+        self.hop_length = 512
+        self.n_fft = 2048
+        self.stream = stream
+        self.block_size = block_size
+        self.mmap_dir = mmap_dir
+        self.res_type = res_type
+        self.dtype = dtype
+        if feature_names is None:
+            feature_names = FEATURE_NAMES
+        self.feature_names = self._check_names(
+            feature_names, FEATURE_NAMES + self._custom_feature_names()
+        )
+        self.timing_names = self._check_names(timing_names, TIMING_NAMES)
+        self.threads = threads
+        self.offset = float(offset)
+        self._load_duration = duration
+        self._raw_samples = None
+        self._analysis_samples = None
+        self._zero_indexes = None
+        self._intermediates = {}
+
+    @staticmethod
+    def _check_names(names, available):
+        """
+        Validates a selection of features or timings, defaulting to all of them.
+        """
+        if names is None:
+            return available
+        if isinstance(names, six.string_types):
+            names = [names]
+        for name in names:
+            if name not in available:
+                raise AudioError(
+                    'Unknown name: {0}.  Choose from: {1}'.format(name, available)
+                )
+        return tuple(names)
 
-        self.analysis_samples = librosa.resample(
-            librosa.to_mono(y), sr, self.analysis_sample_rate, res_type='kaiser_best'
+    @property
+    def raw_samples(self):
+        """
+        Samples at `sample_rate`, with one row per channel.
+        When streaming, these are decoded on first access.
+        """
+        if self._raw_samples is None:
+            if self.mmap_dir:
+                y = self._load_memmap(self.sample_rate)
+            else:
+                y, _ = librosa.load(
+                    self.file_path,
+                    mono=self.convert_to_mono,
+                    sr=self.sample_rate,
+                    offset=self.offset,
+                    duration=self._load_duration,
+                )
+            self._raw_samples = self._as_raw_samples(y)
+        return self._raw_samples
+
+    def _as_raw_samples(self, y):
+        """
+        Shapes samples into one row per channel, cast to `dtype`.
+        Memory-mapped samples stay float32, as casting would copy them into memory.
+        """
+        y = np.atleast_2d(y)
+        if isinstance(y, np.memmap):
+            return y
+        return self._as_dtype(y)
+
+    def _load_memmap(self, sample_rate):
+        """
+        Memory-maps the decoded samples in `mmap_dir`, decoding the file first if needed.
+        The whole file is decoded, but only the window being loaded is mapped in.
+        """
+        y = load_memmap(
+            self.file_path,
+            self.mmap_dir,
+            sample_rate=sample_rate,
+            mono=self.convert_to_mono,
+            block_size=self.block_size,
         )
-        self.raw_samples = np.atleast_2d(y)
+        start, frames = self._window(sample_rate, y.shape[-1])
+        return y[:, start : start + frames]
 
-        self.zero_indexes = self._create_zero_indexes()
-        self.features = self._create_features()
-        self.timings = self._create_timings()
+    def _window(self, sample_rate, total_frames):
+        """
+        Gets the first sample, and the number of samples, of the window being loaded.
+
+        Parameters
+        ---------
+        sample_rate: number > 0 [scalar]
+            sample rate to count samples at
+
+        total_frames: integer
+            number of samples in the whole file, at `sample_rate`
+
+        Returns
+        -----
+        (start, frames)
+        """
+        start = min(int(round(self.offset * sample_rate)), total_frames)
+        frames = total_frames - start
+        if self._load_duration is not None:
+            frames = min(frames, int(round(self._load_duration * sample_rate)))
+        return start, frames
+
+    def _file_window(self):
+        """
+        Gets the window being loaded, in samples at the file's own rate.
+        """
+        info = sf.info(self.file_path)
+        return self._window(info.samplerate, info.frames)
+
+    def _as_dtype(self, samples):
+        """
+        Casts samples or feature data to `dtype`, if one was given.
+        """
+        if self.dtype is None:
+            return samples
+        return samples.astype(self.dtype, copy=False)
+
+    @property
+    def zero_indexes(self):
+        """
+        Zero crossing indexes for each channel, computed on first access.
+        """
+        if self._zero_indexes is None:
+            self._zero_indexes = self._create_zero_indexes()
+        return self._zero_indexes
+
+    @property
+    def analysis_samples(self):
+        """
+        Mono samples at `analysis_sample_rate`, resampled on first access.
+        """
+        if self._analysis_samples is None:
+            self._analysis_samples = _resample(
+                librosa.to_mono(self.raw_samples),
+                self.sample_rate,
+                self.analysis_sample_rate,
+                self.res_type,
+            )
+            self._analysis_samples = self._as_dtype(self._analysis_samples)
+        return self._analysis_samples
+
+    def __getstate__(self):
+        # Intermediate results and resampled samples can be large, and are recomputed if needed.
+        state = self.__dict__.copy()
+        state['_intermediates'] = {}
+        state['_analysis_samples'] = None
+        if self.mmap_dir:
+            # Memory-mapped samples are reloaded from disk, rather than copied.
+            state['_raw_samples'] = None
+        return state
 
     def __repr__(self):
         file_name = os.path.split(self.file_path)[-1]
         args = file_name, self.duration
         return '<Audio, file: {0:s}, duration: {1:.2f}>'.format(*args)
 
+    @classmethod
+    def load_async(cls, file_path=None, timeout=None, executor=None, **kwargs):
+        """
+        Load and fully analyse audio without blocking the asyncio event loop.
+        Use as `audio = await Audio.load_async(file_path)`, from a running event loop.
+
+        Decoding and analysis run in `executor`, which by default is a thread pool
+        shared by every call, so many concurrent loads queue for a bounded
+        number of threads.  Cancelling the awaiting task, or running past `timeout`,
+        abandons the load: a load that has not started is never run, and one that has
+        started finishes in the background and is discarded.
+
+        Parameters
+        ----------
+        file_path: string
+            path to the audio file to load
+
+        timeout: number > 0 [scalar]
+            (optional) seconds to wait before raising `asyncio.TimeoutError`
+
+        executor: concurrent.futures.Executor
+            (optional) executor to load in, instead of the shared thread pool
+
+        kwargs:
+            additional arguments passed to `Audio`
+
+        Returns
+        ------
+        awaitable
+            resolves to an Audio object with every selected feature and timing computed
+        """
+        import asyncio
+
+        # get_running_loop is new in Python 3.7.
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        future = loop.run_in_executor(
+            executor or _load_executor(), _load, cls, file_path, kwargs
+        )
+        return asyncio.wait_for(future, timeout)
+
     def output(self, filename, format=None):
         """
         Write the samples out to the given filename.
@@ -118,39 +483,177 @@ class Audio(object):
         """
         Create zero crossing indexes.
         We use these in synthesis, and it is easier to make them here.
+        Each index is a sorted array of sample positions, stored as int32 when possible.
         """
         zero_indexes = []
         for channel_index in range(self.num_channels):
             channel = self.raw_samples[channel_index]
             zero_crossings = librosa.zero_crossings(channel)
-            zero_index = np.nonzero(zero_crossings)[0]
+            zero_index = np.flatnonzero(zero_crossings)
+            # int32 halves the size of the index, for anything under 13 hours at 44.1kHz
+            if len(channel) < np.iinfo(np.int32).max:
+                zero_index = zero_index.astype(np.int32)
             zero_indexes.append(zero_index)
         return zero_indexes
 
+    def _create_analysis(self):
+        """
+        Creates the raw analysis results that features and timings are built from.
+        Each entry is a numpy array, computed on first access.
+        These are what the analysis cache stores.
+
+        Returns
+        -----
+        LazyDict
+        """
+        analysis = LazyDict()
+        for name in self.feature_names + self.timing_names:
+            if name != 'track':
+                analysis.set_lazy(name, partial(self._compute, name))
+        return analysis
+
+    def _extractors(self):
+        """
+        Gets the registered extractors, with the streaming ones in place when streaming.
+        """
+        extractors = dict(EXTRACTORS)
+        if self.stream:
+            extractors.update(STREAM_EXTRACTORS)
+        return extractors
+
+    def _extract(self, names, executor=None):
+        """
+        Runs the extractors for some of the raw analysis results, and stores the results.
+        Intermediates are computed once.  Those that results still to be computed
+        depend on are kept in `_intermediates`, and the rest are freed.
+
+        Parameters
+        ---------
+        names: list [strings]
+            names of entries in `_analysis`
+
+        executor: concurrent.futures.Executor
+            (optional) runs independent extractors concurrently
+
+        Returns
+        -----
+        dict
+            the results, keyed by name
+        """
+        pending = [
+            name
+            for name in self._analysis
+            if name not in names and not self._analysis.is_loaded(name)
+        ]
+        results = extract(
+            self,
+            names,
+            self._extractors(),
+            intermediates=self._intermediates,
+            keep=pending,
+            executor=executor,
+        )
+        for name, value in results.items():
+            self._analysis[name] = value
+        return results
+
+    def _extract_all(self):
+        """
+        Computes every raw analysis result that has not been computed yet, in one pass.
+        With `threads`, independent extractors run concurrently in a thread pool.
+        """
+        names = [name for name in self._analysis if not self._analysis.is_loaded(name)]
+        if not names:
+            return
+        if self.threads:
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                self._extract(names, executor=executor)
+        else:
+            self._extract(names)
+
+    def _compute(self, name):
+        """
+        Computes one raw analysis result.
+        """
+        return self._extract([name])[name]
+
+    def _load_analysis(self, cache):
+        """
+        Fills in the raw analysis and zero crossings from an AnalysisCache.
+        On a miss, computes everything and stores it in the cache.
+
+        Parameters
+        ---------
+        cache: string or AnalysisCache
+            the cache, or the directory of the cache
+        """
+        if not isinstance(cache, AnalysisCache):
+            cache = AnalysisCache(cache)
+
+        if self.stream:
+            # Hash the file block by block, rather than decoding it all.
+            start, frames = self._file_window()
+            samples = sf.blocks(
+                self.file_path, blocksize=self.block_size, start=start, frames=frames
+            )
+        else:
+            samples = self.raw_samples
+        key = cache.key(
+            samples,
+            sample_rate=self.sample_rate,
+            analysis_sample_rate=self.analysis_sample_rate,
+            stream=self.stream,
+            res_type=self.res_type,
+            feature_names=sorted(self.feature_names),
+            timing_names=sorted(self.timing_names),
+        )
+        arrays = cache.load(key)
+        if arrays is None:
+            self._extract_all()
+            arrays = dict(self._analysis.items())
+            if not self.stream:
+                for channel_index, zero_index in enumerate(self.zero_indexes):
+                    arrays['zero_index_%s' % (channel_index)] = zero_index
+            cache.save(key, arrays)
+        else:
+            if 'zero_index_0' in arrays:
+                self._zero_indexes = [
+                    arrays.pop('zero_index_%s' % (channel_index))
+                    for channel_index in range(self.num_channels)
+                ]
+            for name, value in arrays.items():
+                self._analysis[name] = value
+
     def _create_timings(self):
         """
         Create timings in a timings dict.
+        Beats and segments are only computed when they are first accessed.
         """
-        timings = {}
-        timings['track'] = TimingList('track', [(0, self.duration)], self)
-        timings['beats'] = TimingList('beats', self._get_beats(), self)
-        timings['segments'] = TimingList('segments', self._get_segments(), self)
+        getters = {'beats': self._get_beats, 'segments': self._get_segments}
+
+        timings = LazyDict()
+        for name in self.timing_names:
+            if name == 'track':
+                timings['track'] = TimingList(
+                    'track', [(self.offset, self.duration)], self
+                )
+            else:
+                timings.set_lazy(
+                    name, partial(self._get_timing_list, name, getters[name])
+                )
         return timings
 
-    def _get_beats(self):
+    def _get_timing_list(self, name, get_timings):
         """
-        Gets beats using librosa's beat tracker.
+        Builds a named TimingList from the (start, duration) tuples returned by `get_timings`.
         """
-        _, beat_frames = librosa.beat.beat_track(
-            y=self.analysis_samples, sr=self.analysis_sample_rate, trim=False
-        )
-
-        # pad beat times to full duration
-        f_max = librosa.time_to_frames(self.duration, sr=self.analysis_sample_rate)
-        beat_frames = librosa.util.fix_frames(beat_frames, x_min=0, x_max=f_max)
+        return TimingList(name, get_timings(), self)
 
-        # convert frames to times
-        beat_times = librosa.frames_to_time(beat_frames, sr=self.analysis_sample_rate)
+    def _get_beats(self):
+        """
+        Gets beats as a list of (start, duration) tuples.
+        """
+        beat_times = self._analysis['beats'] + self.offset
 
         # make the list of (start, duration) tuples that TimingList expects
         starts_durs = [(s, t - s) for (s, t) in zip(beat_times, beat_times[1:])]
@@ -159,15 +662,9 @@ class Audio(object):
 
     def _get_segments(self):
         """
-        Gets Echo Nest style segments using librosa's onset detection and backtracking.
+        Gets segments as a list of (start, duration) tuples.
         """
-
-        onset_frames = librosa.onset.onset_detect(
-            y=self.analysis_samples, sr=self.analysis_sample_rate, backtrack=True
-        )
-        segment_times = librosa.frames_to_time(
-            onset_frames, sr=self.analysis_sample_rate
-        )
+        segment_times = self._analysis['segments'] + self.offset
 
         # make the list of (start, duration) tuples that TimingList expects
         starts_durs = [(s, t - s) for (s, t) in zip(segment_times, segment_times[1:])]
@@ -176,7 +673,8 @@ class Audio(object):
 
     def _create_features(self):
         """
-        Creates the FeatureCollection, and loads each feature.
+        Creates the FeatureCollection, and registers each feature.
+        Features are only computed when they are first accessed.
 
         Parameters
         ---------
@@ -187,14 +685,60 @@ class Audio(object):
             FeatureCollection with each Amen.Feature object named correctly.
             Note that _get_chroma returns a FeatureCollection of chroma features.
         """
+        getters = {
+            'centroid': self._get_centroid,
+            'amplitude': self._get_amplitude,
+            'timbre': self._get_timbre,
+            'chroma': self._get_chroma,
+            'tempo': self._get_tempo,
+            'onset_strength': self._get_onset_strength,
+        }
+
         features = FeatureCollection()
-        features['centroid'] = self._get_centroid()
-        features['amplitude'] = self._get_amplitude()
-        features['timbre'] = self._get_timbre()
-        features['chroma'] = self._get_chroma()
-        features['tempo'] = self._get_tempo()
+        for name in self.feature_names:
+            if name in getters:
+                features.set_lazy(name, getters[name])
+            else:
+                features.set_lazy(name, partial(self._get_extracted, name))
         return features
 
+    def _custom_feature_names(self):
+        """
+        Gets the names of extractors registered as features, other than the built-in ones.
+        """
+        return tuple(
+            sorted(
+                name
+                for name, extractor in self._extractors().items()
+                if extractor.feature and name not in FEATURE_NAMES
+            )
+        )
+
+    def _get_extracted(self, name):
+        """
+        Gets the result of a custom extractor.  A result with one row is returned
+        as a Feature, and one with N rows as a MatrixFeatureCollection of N features,
+        keyed "<name>_<index>".
+
+        Parameters
+        ---------
+        name: string
+            name of the registered extractor
+
+        Returns
+        -----
+        Feature or MatrixFeatureCollection
+        """
+        rows = np.atleast_2d(self._analysis[name])
+        if len(rows) == 1:
+            data = self._convert_to_dataframe(rows, [name])
+            return Feature(data, frame_index=self._frame_index(len(data)))
+
+        keys = ['%s_%s' % (name, index) for index in range(len(rows))]
+        data = self._convert_to_dataframe(rows, keys)
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
+        return MatrixFeatureCollection(feature)
+
     def _get_centroid(self):
         """
         Gets spectral centroid data from librosa, and returns it as a Feature
@@ -206,9 +750,9 @@ class Audio(object):
         -----
         Feature
         """
-        centroids = librosa.feature.spectral_centroid(self.analysis_samples)
+        centroids = self._analysis['centroid']
         data = self._convert_to_dataframe(centroids, ['spectral_centroid'])
-        feature = Feature(data)
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
         return feature
 
     def _get_amplitude(self):
@@ -222,9 +766,9 @@ class Audio(object):
         -----
         Feature
         """
-        amplitudes = librosa.feature.rms(self.analysis_samples)
+        amplitudes = self._analysis['amplitude']
         data = self._convert_to_dataframe(amplitudes, ['amplitude'])
-        feature = Feature(data)
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
         return feature
 
     def _get_timbre(self):
@@ -232,52 +776,43 @@ class Audio(object):
         Gets timbre (MFCC) data, taking the first 20.
         Note that the keys to the Feature are "mffc_<index>",
         to avoid having a dict-like object with numeric keys.
+        Each key's Feature names its data column "timbre", and the matrix
+        of every MFCC is the collection's `feature`.
 
         Parameters
         ---------
 
         Returns
         -----
-        Feature
+        MatrixFeatureCollection
         """
-        mfccs = librosa.feature.mfcc(
-            y=self.analysis_samples, sr=self.analysis_sample_rate, n_mfcc=12
-        )
-        feature = FeatureCollection()
-        for index, mfcc in enumerate(mfccs):
-            data = self._convert_to_dataframe(mfcc, ['timbre'])
-            key = 'mfcc_%s' % (index)
-            feature[key] = Feature(data)
-
-        return feature
+        mfccs = self._analysis['timbre']
+        keys = ['mfcc_%s' % (index) for index in range(len(mfccs))]
+        data = self._convert_to_dataframe(mfccs, keys)
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
+        return MatrixFeatureCollection(feature, column_name='timbre')
 
     def _get_chroma(self):
         """
         Gets chroma data from librosa, and returns it as a FeatureCollection,
-        with 12 features.
+        with 12 features that share one matrix.
 
         Parameters
         ---------
 
         Returns
         -----
-        FeatureCollection
+        MatrixFeatureCollection
         """
-        feature = FeatureCollection()
         pitch_names = ['c', 'c#', 'd', 'eb', 'e', 'f', 'f#', 'g', 'ab', 'a', 'bb', 'b']
-        chroma_cq = librosa.feature.chroma_cqt(self.analysis_samples)
-        for chroma, pitch in zip(chroma_cq, pitch_names):
-            data = self._convert_to_dataframe(chroma, [pitch])
-            feature[pitch] = Feature(data)
+        chroma_cq = self._analysis['chroma']
+        data = self._convert_to_dataframe(chroma_cq, pitch_names)
 
         # Enharmonic aliases
-        feature['db'] = feature['c#']
-        feature['d#'] = feature['eb']
-        feature['gb'] = feature['f#']
-        feature['g#'] = feature['ab']
-        feature['a#'] = feature['bb']
+        aliases = {'db': 'c#', 'd#': 'eb', 'gb': 'f#', 'g#': 'ab', 'a#': 'bb'}
 
-        return feature
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
+        return MatrixFeatureCollection(feature, aliases)
 
     def _get_tempo(self):
         """
@@ -292,19 +827,32 @@ class Audio(object):
         -----
         FeatureCollection
         """
-        onset_env = librosa.onset.onset_strength(
-            self.analysis_samples, sr=self.analysis_sample_rate
-        )
-        tempo = librosa.beat.tempo(
-            onset_envelope=onset_env, sr=self.analysis_sample_rate, aggregate=None
-        )
+        tempo = self._analysis['tempo']
         data = self._convert_to_dataframe(tempo, ['tempo'])
-        feature = Feature(data, aggregate=np.median)
+        feature = Feature(
+            data, aggregate=np.median, frame_index=self._frame_index(len(data))
+        )
 
         return feature
 
-    @classmethod
-    def _convert_to_dataframe(cls, feature_data, columns):
+    def _get_onset_strength(self):
+        """
+        Gets the onset strength envelope shared by beat tracking, segmentation and tempo,
+        and returns it as a Feature.
+
+        Parameters
+        ---------
+
+        Returns
+        -----
+        Feature
+        """
+        onset_strength = self._analysis['onset_strength']
+        data = self._convert_to_dataframe(onset_strength, ['onset_strength'])
+        feature = Feature(data, frame_index=self._frame_index(len(data)))
+        return feature
+
+    def _convert_to_dataframe(self, feature_data, columns):
         """
         Take raw librosa feature data, convert to a pandas dataframe.
 
@@ -316,13 +864,182 @@ class Audio(object):
         columns: list [strings]
             a list of column names of length N, the same as the N dimension of feature_data
 
+        Frames are converted to times with `analysis_sample_rate` and `hop_length`,
+        counting from `offset`.
+
         Returns
         -----
         pandas.DataFrame
         """
-        feature_data = feature_data.transpose()
-        frame_numbers = np.arange(len(feature_data))
-        indexes = librosa.frames_to_time(frame_numbers)
-        indexes = pd.to_timedelta(indexes, unit='s')
+        feature_data = self._as_dtype(feature_data.transpose())
+        indexes = self._frame_index(len(feature_data)).to_timedelta()
         data = pd.DataFrame(data=feature_data, index=indexes, columns=columns)
         return data
+
+    def _frame_index(self, length):
+        """
+        The analysis frames of a feature with `length` frames.
+
+        Parameters
+        ---------
+        length: int
+            number of frames
+
+        Returns
+        -----
+        FrameIndex
+        """
+        return FrameIndex(
+            length, self.analysis_sample_rate, self.hop_length, offset=self.offset
+        )
+
+
+# Polyphase anti-aliasing filters, keyed by (up, down), shared by all Audio objects.
+_POLYPHASE_FILTERS = {}
+
+
+def _resample(y, orig_sr, target_sr, res_type):
+    """
+    Resamples `y`, skipping the work entirely if the rates already match.
+    The 'polyphase' filter is designed once per pair of rates, and then reused.
+    """
+    if orig_sr == target_sr:
+        return y
+
+    if res_type != 'polyphase':
+        return librosa.resample(
+            y, orig_sr=orig_sr, target_sr=target_sr, res_type=res_type
+        )
+
+    gcd = np.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // gcd, int(orig_sr) // gcd
+    if (up, down) not in _POLYPHASE_FILTERS:
+        # The same filter scipy designs by default.
+        max_rate = max(up, down)
+        _POLYPHASE_FILTERS[up, down] = scipy.signal.firwin(
+            2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0)
+        )
+    window = _POLYPHASE_FILTERS[up, down].astype(y.dtype)
+    return scipy.signal.resample_poly(y, up, down, window=window)
+
+
+# Number of threads shared by all calls to Audio.load_async.
+# None uses one per CPU, counted when the first load starts.
+LOAD_ASYNC_WORKERS = None
+
+_LOAD_EXECUTOR = None
+
+
+def _load_executor():
+    """
+    Gets the thread pool shared by all calls to `Audio.load_async`, creating it on first use.
+    """
+    global _LOAD_EXECUTOR
+    if _LOAD_EXECUTOR is None:
+        workers = LOAD_ASYNC_WORKERS or multiprocessing.cpu_count()
+        _LOAD_EXECUTOR = ThreadPoolExecutor(max_workers=workers)
+    return _LOAD_EXECUTOR
+
+
+def _load(cls, file_path, kwargs):
+    """
+    Loads and fully analyses one file, for `Audio.load_async`.
+    """
+    audio = cls(file_path, **kwargs)
+    audio._extract_all()
+    return audio
+
+
+def _analyze(file_path, kwargs):
+    """
+    Loads and fully analyses one file, for use in a worker process.
+    Errors are returned rather than raised, so that one bad file does not stop a batch.
+    """
+    try:
+        audio = Audio(file_path, **kwargs)
+        audio._extract_all()
+        return audio
+    except Exception as e:
+        return e
+
+
+# Marks the end of the file paths in analyze_many.
+_NO_MORE_FILES = object()
+
+
+def analyze_many(file_paths, workers=None, ordered=True, max_pending=None, **kwargs):
+    """
+    Analyse many audio files across a pool of processes.
+
+    Parameters
+    ----------
+
+    file_paths: iterable of strings
+        paths to the audio files to load
+
+    workers: integer > 0
+        (optional) number of worker processes.  Defaults to the number of CPUs.
+
+    ordered: boolean
+        (optional) if True, yield results in input order.
+        Otherwise, yield them as soon as they complete.
+
+    max_pending: integer > 0
+        (optional) maximum number of files submitted but not yet yielded.
+        Defaults to twice the number of workers.
+
+    kwargs:
+        additional arguments passed to each `Audio`
+
+    Yields
+    ------
+    (file_path, result)
+        result is a fully analysed Audio object, or the exception raised
+        while loading or analysing that file.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = max_pending or 2 * workers
+    file_paths = iter(file_paths)
+    pending = collections.deque()
+
+    def submit(executor):
+        # Keep up to max_pending files in flight, and return the executor in use.
+        while len(pending) < max_pending:
+            file_path = next(file_paths, _NO_MORE_FILES)
+            if file_path is _NO_MORE_FILES:
+                break
+            try:
+                future = executor.submit(_analyze, file_path, kwargs)
+            except BrokenProcessPool:
+                # A worker died, and took the pool with it.  The files it had
+                # are reported as errors when they come up; carry on with a new pool.
+                executor.shutdown(wait=True)
+                executor = ProcessPoolExecutor(max_workers=workers)
+                future = executor.submit(_analyze, file_path, kwargs)
+            pending.append((file_path, future))
+        return executor
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        executor = submit(executor)
+
+        while pending:
+            if ordered:
+                file_path, future = pending.popleft()
+            else:
+                done, _ = wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                file_path, future = next(item for item in pending if item[1] in done)
+                pending.remove((file_path, future))
+
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself failed.
+                result = e
+
+            executor = submit(executor)
+            yield file_path, result
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''On-disk caches for analysis results and decoded samples'''
+
+import os
+import glob
+import hashlib
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+import librosa
+
+from .version import version
+
+
+class AnalysisCache(object):
+    """
+    A directory of analysis results, keyed by audio content and analysis parameters.
+
+    Each entry is a single uncompressed `.npz` file of numpy arrays.
+    Entries are written atomically, so several processes can share one directory.
+    When the directory grows past `max_size` bytes, the least recently used
+    entries are removed.
+
+    Attributes
+    ----------
+        directory: string
+            path to the cache directory
+        max_size: integer
+            maximum total size of the cache, in bytes
+    """
+
+    extension = '.npz'
+
+    def __init__(self, directory, max_size=2**30):
+        """
+        AnalysisCache constructor.
+        Creates the cache directory if it does not exist.
+
+        Parameters
+        ----------
+
+        directory: string
+            path to the cache directory
+
+        max_size: integer > 0
+            (optional) maximum total size of the cache, in bytes.  Defaults to 1GB.
+
+        Returns
+        ------
+        An AnalysisCache object
+        """
+        self.directory = directory
+        self.max_size = max_size
+        _make_directory(directory)
+
+    def __repr__(self):
+        return '<AnalysisCache, directory: {0:s}>'.format(self.directory)
+
+    @classmethod
+    def key(cls, samples, **params):
+        """
+        Build a cache key from decoded samples and analysis parameters.
+        The library version is always part of the key.
+
+        Parameters
+        ----------
+        samples: np.array, or iterable of np.arrays
+            the decoded samples, either whole or in blocks
+
+        params: keyword arguments
+            analysis parameters that change the results
+
+        Returns
+        -------
+        string
+            a hex digest
+        """
+        digest = hashlib.sha1()
+        if isinstance(samples, np.ndarray):
+            digest.update(str(samples.shape).encode('utf-8'))
+            samples = [samples]
+        for block in samples:
+            digest.update(str(block.dtype).encode('utf-8'))
+            digest.update(np.ascontiguousarray(block).view(np.uint8))
+        digest.update(version.encode('utf-8'))
+        for name in sorted(params):
+            digest.update('{0}={1!r};'.format(name, params[name]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def load(self, key):
+        """
+        Load the arrays stored under `key`.
+
+        Parameters
+        ----------
+        key: string
+            a key from `AnalysisCache.key`
+
+        Returns
+        -------
+        dict or None
+            a dict of numpy arrays, or None if there is no usable entry
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in stored.files}
+        except (IOError, OSError, ValueError, KeyError):
+            # Missing, evicted by another process, or unreadable.
+            return None
+
+        try:
+            # Mark the entry as recently used.
+            os.utime(path, None)
+        except OSError:
+            pass
+        return arrays
+
+    def save(self, key, arrays):
+        """
+        Store arrays under `key`, then evict old entries if the cache is too large.
+
+        Parameters
+        ----------
+        key: string
+            a key from `AnalysisCache.key`
+
+        arrays: dict
+            a dict of numpy arrays, keyed by name
+        """
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, **arrays)
+            _replace(temp_path, self._path(key))
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache fits in `max_size`.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, '*' + self.extension)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                # Already removed by another process.
+                pass
+            total_size -= size
+
+
+def load_memmap(file_path, directory, sample_rate=44100, mono=False, block_size=2**16):
+    """
+    Decode an audio file into a raw PCM file in `directory`, and memory-map it.
+    Later calls with the same file and parameters reuse the decoded file.
+
+    Decoded files are never removed: a file that changes, or is decoded
+    at another sample rate, adds a new decoded file beside the old one.
+    Unlike an `AnalysisCache`, the directory grows without limit,
+    and should be cleared by the caller when it is no longer needed.
+
+    If the file is already at `sample_rate`, it is decoded block by block,
+    so the whole file is never held in memory.
+
+    Parameters
+    ----------
+    file_path: string
+        path to the audio file to load
+
+    directory: string
+        directory to store decoded files in
+
+    sample_rate: number > 0 [scalar]
+        (optional) sample rate to decode to
+
+    mono: boolean
+        (optional) mix down to mono
+
+    block_size: integer > 0
+        (optional) number of samples to decode at a time
+
+    Returns
+    -------
+    np.memmap
+        a read-only, float32 array with one row per channel
+    """
+    _make_directory(directory)
+
+    path = os.path.join(directory, _memmap_key(file_path, sample_rate, mono) + '.npy')
+    if not os.path.exists(path):
+        _decode(file_path, path, sample_rate, mono, block_size)
+    return np.load(path, mmap_mode='r')
+
+
+def _memmap_key(file_path, sample_rate, mono):
+    """
+    Build the name of a decoded file from the path, size and modification time
+    of the audio file, rather than from the samples it is about to decode.
+    """
+    stat = os.stat(file_path)
+    params = (
+        version,
+        os.path.abspath(file_path),
+        stat.st_size,
+        stat.st_mtime,
+        sample_rate,
+        mono,
+    )
+    return hashlib.sha1(repr(params).encode('utf-8')).hexdigest()
+
+
+def _decode(file_path, path, sample_rate, mono, block_size):
+    """
+    Decode an audio file into an `.npy` file at `path`, atomically.
+    """
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(handle)
+    try:
+        info = sf.info(file_path)
+        if info.samplerate == sample_rate:
+            num_channels = 1 if mono else info.channels
+            samples = np.lib.format.open_memmap(
+                temp_path,
+                mode='w+',
+                dtype=np.float32,
+                shape=(num_channels, info.frames),
+            )
+            start = 0
+            blocks = sf.blocks(
+                file_path, blocksize=block_size, dtype='float32', always_2d=True
+            )
+            for block in blocks:
+                if mono:
+                    block = block.mean(axis=1, keepdims=True)
+                samples[:, start : start + len(block)] = block.T
+                start += len(block)
+            samples.flush()
+            del samples
+        else:
+            y, _ = librosa.load(file_path, mono=mono, sr=sample_rate)
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.atleast_2d(y))
+        _replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+def _replace(source, destination):
+    """
+    Atomically rename `source` to `destination`, overwriting it if it exists.
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+        return
+    # Python 2 has no os.replace; os.rename overwrites on POSIX, but not on Windows.
+    try:
+        os.rename(source, destination)
+    except OSError:
+        if not os.path.exists(destination):
+            raise
+        os.remove(destination)
+        os.rename(source, destination)
+
+
+def _make_directory(directory):
+    """
+    Create a directory if it does not exist yet.
+    """
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Another process may have created it in the meantime.
+            if not os.path.isdir(directory):
+                raise
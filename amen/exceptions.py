@@ -11,6 +11,14 @@ class AmenError(Exception):
     pass
 
 
+class AudioError(AmenError):
+    """
+    Exception class for errors in audio.py
+    """
+
+    pass
+
+
 class SynthesizeError(AmenError):
     """
     Exception class for errors in synthesize.py
@@ -25,3 +33,11 @@ class FeatureError(AmenError):
     """
 
     pass
+
+
+class ExtractorError(AmenError):
+    """
+    Exception class for errors in extractors.py
+    """
+
+    pass
@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''Feature extractors, and a scheduler that runs them in dependency order'''
+
+from functools import partial
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import numpy as np
+
+import librosa
+
+from .exceptions import ExtractorError
+from .streaming import stream_analysis
+
+
+class Extractor(object):
+    """
+    A named analysis step, and the names of the results it is computed from.
+
+    The function is called as `function(audio, *inputs)`, with one input
+    for each name in `requires`, in order.  It should only read parameters
+    such as `hop_length` from the Audio, and take everything else from its inputs,
+    so that it can run in any thread.
+
+    Attributes
+    ----------
+        name: string
+            name of the result
+        function: callable
+            computes the result
+        requires: tuple [strings]
+            names of the results passed to `function`
+        feature: boolean
+            whether the result can be requested as a feature,
+            rather than only as an intermediate
+    """
+
+    def __init__(self, name, function, requires=(), feature=False):
+        self.name = name
+        self.function = function
+        self.requires = tuple(requires)
+        self.feature = feature
+
+    def __repr__(self):
+        args = self.name, ', '.join(self.requires)
+        return '<Extractor, name: {0:s}, requires: ({1:s})>'.format(*args)
+
+
+# Extractors by name, shared by all Audio objects.
+EXTRACTORS = {}
+
+# Extractors that replace those in EXTRACTORS when an Audio is streamed.
+STREAM_EXTRACTORS = {}
+
+
+def register_extractor(name, requires=(), registry=EXTRACTORS, feature=False):
+    """
+    Decorator that registers a function as the extractor for `name`.
+
+    Parameters
+    ----------
+    name: string
+        name of the result.  Registering a name again replaces its extractor.
+
+    requires: tuple [strings]
+        (optional) names of the results the function is computed from,
+        for example 'samples', 'stft', 'mel', 'cqt' or 'onset_envelope'.
+
+    registry: dict
+        (optional) the registry to add the extractor to.
+
+    feature: boolean
+        (optional) if True, the name can be passed in an Audio's `feature_names`.
+        Otherwise, the result is only an intermediate for other extractors.
+
+    Returns
+    -------
+    callable
+        a decorator, which returns the function unchanged
+    """
+
+    def decorator(function):
+        registry[name] = Extractor(name, function, requires, feature=feature)
+        return function
+
+    return decorator
+
+
+def dependencies(names, extractors=EXTRACTORS, available=()):
+    """
+    Find every result that the named results are computed from.
+
+    Parameters
+    ----------
+    names: iterable [strings]
+        names of results
+
+    extractors: dict
+        (optional) Extractors keyed by name
+
+    available: container [strings]
+        (optional) names of results that are already computed.
+        What they are computed from is not needed, so is not included.
+
+    Returns
+    -------
+    set
+        the names, and the names of everything upstream of them
+    """
+    found = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in found:
+            continue
+        if name in available:
+            found.add(name)
+            continue
+        if name not in extractors:
+            raise ExtractorError('No extractor is registered for: {0}'.format(name))
+        found.add(name)
+        stack.extend(extractors[name].requires)
+    return found
+
+
+def extract(
+    audio, names, extractors=EXTRACTORS, intermediates=None, keep=(), executor=None
+):
+    """
+    Compute the named results, computing everything they depend on once.
+
+    Extractors run as soon as their inputs are ready.  An intermediate result
+    is freed as soon as every extractor that needs it has run,
+    unless one of the names in `keep` depends on it.
+
+    Parameters
+    ----------
+    audio: Audio
+        the audio to analyse
+
+    names: iterable [strings]
+        names of the results to compute
+
+    extractors: dict
+        (optional) Extractors keyed by name
+
+    intermediates: dict
+        (optional) results from earlier calls, keyed by name.  These are reused
+        instead of recomputed.  It is updated in place, and afterwards holds
+        the intermediates that the names in `keep` depend on.
+
+    keep: iterable [strings]
+        (optional) names of results that will be computed later
+
+    executor: concurrent.futures.Executor
+        (optional) runs independent extractors concurrently.
+        By default, extractors run one after another in the calling thread.
+
+    Returns
+    -------
+    dict
+        the named results
+    """
+    values = {} if intermediates is None else intermediates
+    names = set(names)
+    kept = dependencies(keep, extractors, available=values)
+
+    # Everything still to compute, and how many extractors are waiting on each input.
+    waiting = dependencies(names, extractors, available=values) - set(values)
+    consumers = {}
+    for name in waiting:
+        for required in extractors[name].requires:
+            consumers[required] = consumers.get(required, 0) + 1
+
+    retained = names | kept
+
+    def finish(name, value):
+        values[name] = value
+        for required in extractors[name].requires:
+            consumers[required] -= 1
+            if consumers[required] == 0 and required not in retained:
+                del values[required]
+
+    running = {}
+    try:
+        while waiting or running:
+            ready = sorted(
+                name
+                for name in waiting
+                if all(required in values for required in extractors[name].requires)
+            )
+            if not ready and not running:
+                raise ExtractorError(
+                    'Circular dependency between: {0}'.format(sorted(waiting))
+                )
+
+            for name in ready:
+                waiting.remove(name)
+                extractor = extractors[name]
+                inputs = [values[required] for required in extractor.requires]
+                if executor is None:
+                    finish(name, extractor.function(audio, *inputs))
+                else:
+                    future = executor.submit(extractor.function, audio, *inputs)
+                    running[future] = name
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+    finally:
+        for future in running:
+            future.cancel()
+        wait(running)
+
+    results = {name: values[name] for name in names}
+    kept = dependencies(keep, extractors, available=values)
+    for name in list(values):
+        if name not in kept:
+            del values[name]
+    return results
+
+
+@register_extractor('samples')
+def samples(audio):
+    """
+    Mono samples at the analysis sample rate.
+    """
+    return audio.analysis_samples
+
+
+@register_extractor('stft', requires=('samples',))
+def stft(audio, y):
+    """
+    STFT magnitude of the analysis samples.
+    """
+    return np.abs(librosa.stft(y, n_fft=audio.n_fft, hop_length=audio.hop_length))
+
+
+@register_extractor('power', requires=('stft',))
+def power(audio, S):
+    """
+    Power spectrogram.
+    """
+    return S**2
+
+
+@register_extractor('mel', requires=('power',))
+def mel(audio, S):
+    """
+    Mel spectrogram.
+    """
+    return librosa.feature.melspectrogram(S=S, sr=audio.analysis_sample_rate)
+
+
+@register_extractor('log_mel', requires=('mel',))
+def log_mel(audio, S):
+    """
+    Mel spectrogram in dB, as used for MFCCs and onset strength.
+    """
+    return librosa.power_to_db(S)
+
+
+@register_extractor('cqt', requires=('samples',))
+def cqt(audio, y):
+    """
+    Constant-Q magnitude over seven octaves, at three bins per semitone, as chroma uses.
+    """
+    return np.abs(
+        librosa.cqt(
+            y,
+            sr=audio.analysis_sample_rate,
+            hop_length=audio.hop_length,
+            n_bins=7 * 36,
+            bins_per_octave=36,
+            tuning=None,
+        )
+    )
+
+
+@register_extractor('onset_flux', requires=('log_mel',))
+def onset_flux(audio, S):
+    """
+    Positive spectral flux of the log-mel spectrogram, in each mel band.
+    The first frame has no flux.
+    """
+    return np.maximum(0.0, S[:, 1:] - S[:, :-1])
+
+
+def _onset_envelope(aggregate, audio, flux):
+    """
+    Aggregates the spectral flux across mel bands, matching librosa's `onset_strength`.
+    """
+    # delay by one frame for the difference, and by half a frame for centering
+    delay = 1 + audio.n_fft // (2 * audio.hop_length)
+    envelope = np.pad(aggregate(flux, axis=0), (delay, 0), mode='constant')
+    return envelope[: flux.shape[1] + 1]
+
+
+# Mean aggregated for onsets and tempo, and median aggregated for librosa's beat tracker.
+register_extractor('onset_envelope', requires=('onset_flux',))(
+    partial(_onset_envelope, np.mean)
+)
+register_extractor('beat_envelope', requires=('onset_flux',))(
+    partial(_onset_envelope, np.median)
+)
+
+
+@register_extractor('beats', requires=('beat_envelope',))
+def beats(audio, onset_envelope):
+    """
+    Beat times from librosa's beat tracker, padded out to the full duration.
+    """
+    _, beat_frames = librosa.beat.beat_track(
+        onset_envelope=onset_envelope,
+        sr=audio.analysis_sample_rate,
+        hop_length=audio.hop_length,
+        trim=False,
+    )
+
+    # pad beat times to full duration
+    f_max = librosa.time_to_frames(
+        audio.duration, sr=audio.analysis_sample_rate, hop_length=audio.hop_length
+    )
+    beat_frames = librosa.util.fix_frames(beat_frames, x_min=0, x_max=f_max)
+
+    # convert frames to times
+    return librosa.frames_to_time(
+        beat_frames, sr=audio.analysis_sample_rate, hop_length=audio.hop_length
+    )
+
+
+@register_extractor('segments', requires=('onset_envelope',))
+def segments(audio, onset_envelope):
+    """
+    Echo Nest style segment times, from librosa's onset detection and backtracking.
+    """
+    onset_frames = librosa.onset.onset_detect(
+        onset_envelope=onset_envelope,
+        sr=audio.analysis_sample_rate,
+        hop_length=audio.hop_length,
+        backtrack=True,
+    )
+    return librosa.frames_to_time(
+        onset_frames, sr=audio.analysis_sample_rate, hop_length=audio.hop_length
+    )
+
+
+@register_extractor('centroid', requires=('stft',), feature=True)
+def centroid(audio, S):
+    """
+    Spectral centroids.
+    """
+    return librosa.feature.spectral_centroid(S=S, sr=audio.analysis_sample_rate)
+
+
+@register_extractor('amplitude', requires=('samples',), feature=True)
+def amplitude(audio, y):
+    """
+    RMS amplitude.
+    """
+    return librosa.feature.rms(y=y)
+
+
+@register_extractor('timbre', requires=('log_mel',), feature=True)
+def timbre(audio, S):
+    """
+    The first 12 MFCCs.
+    """
+    return librosa.feature.mfcc(S=S, n_mfcc=12)
+
+
+@register_extractor('chroma', requires=('cqt',), feature=True)
+def chroma(audio, C):
+    """
+    Constant-Q chroma.
+    """
+    return librosa.feature.chroma_cqt(C=C, sr=audio.analysis_sample_rate)
+
+
+@register_extractor('tempo', requires=('onset_envelope',), feature=True)
+def tempo(audio, onset_envelope):
+    """
+    A per-frame tempo estimate.
+    """
+    return librosa.beat.tempo(
+        onset_envelope=onset_envelope,
+        sr=audio.analysis_sample_rate,
+        hop_length=audio.hop_length,
+        aggregate=None,
+    )
+
+
+@register_extractor('onset_strength', requires=('onset_envelope',), feature=True)
+def onset_strength(audio, onset_envelope):
+    """
+    The onset strength envelope shared by segmentation and tempo.
+    """
+    return onset_envelope
+
+
+@register_extractor('stream', registry=STREAM_EXTRACTORS)
+def stream(audio):
+    """
+    Every streamed result, from one block by block pass over the file.
+    """
+    start, frames = audio._file_window()
+    return stream_analysis(
+        audio.file_path,
+        start=start,
+        frames=frames,
+        hop_length=audio.hop_length,
+        n_fft=audio.n_fft,
+        block_size=audio.block_size,
+        # Keep the mel filters within the band the usual analysis would see.
+        fmax=256.0 * audio.analysis_sample_rate / audio.hop_length,
+    )
+
+
+def _streamed(name, audio, results):
+    """
+    Picks one result out of the streaming pass.
+    """
+    return results[name]
+
+
+for _name in (
+    'centroid',
+    'amplitude',
+    'timbre',
+    'chroma',
+    'onset_envelope',
+    'beat_envelope',
+):
+    register_extractor(
+        _name,
+        requires=('stream',),
+        registry=STREAM_EXTRACTORS,
+        feature=_name in ('centroid', 'amplitude', 'timbre', 'chroma'),
+    )(partial(_streamed, _name))
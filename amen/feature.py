@@ -1,12 +1,101 @@
 #!/usr/bin/env python
 '''Container classes for feature analysis'''
 
+from collections import OrderedDict
+from functools import partial
+
 import numpy as np
 import pandas as pd
 import six
 
-from .timing import TimeSlice
+import librosa
+
+from .timing import TimeSlice, slice_bounds
 from .exceptions import FeatureError
+from .utils import LazyDict
+
+# How many resamplings each Feature remembers
+AT_CACHE_SIZE = 16
+
+
+class FrameIndex(object):
+    """
+    The times of evenly spaced analysis frames:  frame `k` is at
+    `offset + k * hop_length / sample_rate` seconds.
+
+    The frame times are computed once, as integer nanoseconds, and rows
+    of a Feature on a FrameIndex are found with a binary search of them.
+    Timedeltas are only made for the index of its data frame.
+
+    Attributes
+    ----------
+        length: int
+            number of frames
+        sample_rate: number > 0
+            sample rate of the analysed samples
+        hop_length: int > 0
+            number of samples between frames
+        offset: float
+            time of the first frame, in seconds
+    """
+
+    def __init__(self, length, sample_rate, hop_length, offset=0.0):
+        self.length = length
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.offset = offset
+        self._times = None
+
+    def __repr__(self):
+        args = self.length, self.sample_rate, self.hop_length
+        return '<FrameIndex, frames: {0}, sample_rate: {1}, hop_length: {2}>'.format(
+            *args
+        )
+
+    def __len__(self):
+        return self.length
+
+    def times(self):
+        """
+        Get the time of every frame, in nanoseconds.
+
+        Returns
+        -------
+        np.array [int64]
+            the time of each frame, as it appears in the data frame's index
+        """
+        if self._times is None:
+            seconds = librosa.frames_to_time(
+                np.arange(self.length), sr=self.sample_rate, hop_length=self.hop_length
+            )
+            self._times = pd.to_timedelta(seconds + self.offset, unit='s').asi8
+        return self._times
+
+    def to_timedelta(self):
+        """
+        Get the time of every frame, as an index for a data frame.
+
+        Returns
+        -------
+        pandas.TimedeltaIndex
+        """
+        return pd.to_timedelta(self.times(), unit='ns')
+
+    def frames_at(self, times):
+        """
+        Find the first frame at or after each time.
+
+        Parameters
+        ----------
+        times: np.array [int64]
+            times, in nanoseconds
+
+        Returns
+        -------
+        np.array [int]
+            frame numbers, from 0 to `length`
+        """
+        return np.searchsorted(self.times(), times, side='left')
 
 
 class Feature(object):
@@ -22,7 +111,9 @@ class Feature(object):
         Resample the feature at the given TimeSlices
     """
 
-    def __init__(self, data, aggregate=np.mean, base=None, time_slices=None):
+    def __init__(
+        self, data, aggregate=np.mean, base=None, time_slices=None, frame_index=None
+    ):
         """
         Constructor for feature object
 
@@ -34,6 +125,10 @@ class Feature(object):
         aggregate: function
             resample-aggregation function or mapping
 
+        frame_index: FrameIndex
+            (optional) the analysis frames that the rows of `data` are,
+            if its index is `frame_index.to_timedelta()`
+
         Returns
         ------
         A Feature object
@@ -54,6 +149,26 @@ class Feature(object):
             assert isinstance(base, Feature)
 
         self.base = base
+        self.frame_index = frame_index
+
+        # Features of the same data with other aggregates, keyed by aggregate
+        self._aggregated = {}
+        # Running totals for `windows`, built on first use
+        self._prefix_sums = None
+
+    @property
+    def aggregate(self):
+        """
+        The function that `at` resamples with.
+        """
+        return self._aggregate
+
+    @aggregate.setter
+    def aggregate(self, aggregate):
+        self._aggregate = aggregate
+        # Resampled data, keyed by the bounds of the time slices, least recently used first.
+        # Data resampled with another aggregate is forgotten.
+        self._at_cache = OrderedDict()
 
     def __repr__(self):
         args = self.name
@@ -88,58 +203,498 @@ class Feature(object):
         for i, datum in enumerate(self.data[self.name]):
             yield (self.time_slices[i], datum)
 
-    def at(self, time_slices):
+    def at(self, time_slices, aggregates=None):
         """
         Resample the data at a new time slice index.
 
+        The data for the last `AT_CACHE_SIZE` sets of time slices is remembered,
+        so resampling at the same slices again only builds a new Feature.
+        That data is shared between the Features returned, so should not be changed in place.
+
         Parameters
         ----------
         time_slices: TimeSlice or TimeSlice collection
             The time slices at which to index this feature object
 
+        aggregates: list [strings or functions]
+            (optional) several aggregates to resample with at once, instead of
+            this feature's own.  Names are keys of `AGGREGATES`, such as
+            'mean', 'max', 'std' or 'first'.  The rows of each slice are found once,
+            and shared by every aggregate.  Each aggregate needs a different name.
+
         Returns
         -------
         Feature
             The resampled feature data
+
+        FeatureCollection
+            With `aggregates`, a Feature of the resampled data for each aggregate,
+            keyed by its name
         """
 
         if self.base is not None:
-            return self.base.at(time_slices)
+            return self.base.at(time_slices, aggregates)
 
         if isinstance(time_slices, TimeSlice):
             time_slices = [time_slices]
 
-        # join the time slice values
-        timed_data = pd.DataFrame(columns=self.data.columns)
-
-        # make the new data
-        for slice_t in time_slices:
-            slice_index = (slice_t.time <= self.data.index) & (
-                self.data.index < slice_t.time + slice_t.duration
+        if aggregates is None:
+            features = [self]
+        else:
+            names = [_aggregate_name(aggregate) for aggregate in aggregates]
+            if len(set(names)) < len(names):
+                raise FeatureError(
+                    'Aggregates must have different names: {0}'.format(names)
+                )
+            features = [
+                self._with_aggregate(_aggregate_function(aggregate))
+                for aggregate in aggregates
+            ]
+
+        starts, ends = slice_bounds(time_slices)
+        key = (starts.tobytes(), ends.tobytes())
+        missing = [feature for feature in features if key not in feature._at_cache]
+        if missing:
+            rows = self._slice_rows(starts, ends)
+            # One padded copy of the data is shared by every vectorized aggregate.
+            padded = None
+            if rows is not None and any(
+                feature.aggregate in _SEGMENT_REDUCERS for feature in missing
+            ):
+                padded = _padded(self.data.values)
+            for feature in missing:
+                feature._remember(key, feature._resample(starts, ends, rows, padded))
+
+        # return the new feature objects
+        resampled = [
+            Feature(
+                data=feature._recall(key),
+                aggregate=feature.aggregate,
+                base=feature,
+                time_slices=time_slices,
             )
-            timed_data.loc[slice_t.time] = self.aggregate(
-                self.data[slice_index], axis=0
+            for feature in features
+        ]
+        if aggregates is None:
+            return resampled[0]
+
+        new_features = FeatureCollection()
+        for name, feature in zip(names, resampled):
+            new_features[name] = feature
+        return new_features
+
+    def windows(self, time_slices, durations=None, aggregate='mean', unit='s'):
+        """
+        Aggregate the data over many windows, in constant time per window.
+
+        Running totals of the data are built once, the first time this is called.
+        After that, each window costs the same however long it is,
+        so windows can overlap, slide or repeat freely.
+
+        Parameters
+        ----------
+        time_slices: TimeSlice collection, or np.array
+            the windows, or the start time of each window
+
+        durations: np.array
+            (optional) the duration of each window, when `time_slices` are start times
+
+        aggregate: string
+            one of 'mean', 'sum', 'var' or 'std'
+
+        unit: string
+            (optional) the unit of start times and durations, as for TimeSlice
+
+        Returns
+        -------
+        np.array [shape=(windows, columns)]
+            the aggregated data of each window.
+            The mean, variance and deviation of an empty window are NaN.
+        """
+        if self.base is not None:
+            return self.base.windows(time_slices, durations, aggregate, unit)
+
+        if aggregate not in ('mean', 'sum', 'var', 'std'):
+            raise FeatureError('Windows cannot be aggregated by: {0}'.format(aggregate))
+
+        if durations is None:
+            if isinstance(time_slices, TimeSlice):
+                time_slices = [time_slices]
+            starts, ends = slice_bounds(time_slices)
+        else:
+            starts = pd.to_timedelta(np.asarray(time_slices), unit=unit).asi8
+            ends = starts + pd.to_timedelta(np.asarray(durations), unit=unit).asi8
+
+        rows = self._slice_rows(starts, ends)
+        if rows is None:
+            raise FeatureError('Windows need a feature with a sorted time index.')
+        lo, hi = rows
+
+        if self._prefix_sums is None:
+            self._prefix_sums = PrefixSums(self.data.values)
+        return getattr(self._prefix_sums, aggregate)(lo, np.maximum(lo, hi))
+
+    def _with_aggregate(self, aggregate):
+        """
+        Gets a Feature of the same data with another aggregate.
+        It is kept, so that it remembers its own resamplings.
+        """
+        if aggregate is self.aggregate:
+            return self
+        if aggregate not in self._aggregated:
+            self._aggregated[aggregate] = Feature(
+                self.data, aggregate=aggregate, frame_index=self.frame_index
             )
+        return self._aggregated[aggregate]
 
-        # return the new feature object
-        return Feature(
-            data=timed_data,
-            aggregate=self.aggregate,
-            base=self,
-            time_slices=time_slices,
+    def _remember(self, key, timed_data):
+        """
+        Keeps resampled data, forgetting the least recently used if there is too much.
+        """
+        self._at_cache[key] = timed_data
+        if len(self._at_cache) > AT_CACHE_SIZE:
+            self._at_cache.popitem(last=False)
+
+    def _recall(self, key):
+        """
+        Gets remembered resampled data, and marks it as recently used.
+        """
+        timed_data = self._at_cache.pop(key)
+        self._at_cache[key] = timed_data
+        return timed_data
+
+    def _slice_rows(self, starts, ends):
+        """
+        Find the rows in each of the windows [start, end).
+
+        On a FrameIndex, or a sorted index, the rows are found with one search.
+
+        Parameters
+        ----------
+        starts: np.array
+            window starts, in nanoseconds
+
+        ends: np.array
+            window ends, in nanoseconds
+
+        Returns
+        -------
+        (lo, hi)
+            the rows of each window are `lo` up to `hi`.
+            None if the index is not sorted.
+        """
+        if self.frame_index is not None:
+            return self.frame_index.frames_at(starts), self.frame_index.frames_at(ends)
+
+        if self.data.index.is_monotonic_increasing:
+            index = self.data.index.asi8
+            lo = np.searchsorted(index, starts, side='left')
+            hi = np.searchsorted(index, ends, side='left')
+            return lo, hi
+
+        return None
+
+    def _resample(self, starts, ends, rows, padded=None):
+        """
+        Build the data frame of aggregated data for the windows [start, end).
+        """
+        timed_data = pd.DataFrame(
+            data=self._aggregate_slices(starts, ends, rows, padded),
+            index=pd.to_timedelta(starts, unit='ns'),
+            columns=self.data.columns,
         )
 
+        # keep the precision of floating point data, e.g. float32
+        float_dtypes = {
+            column: dtype
+            for column, dtype in self.data.dtypes.items()
+            if dtype.kind == 'f'
+        }
+        return timed_data.astype(float_dtypes)
+
+    def _aggregate_slices(self, starts, ends, rows, padded=None):
+        """
+        Aggregate the rows in each of the windows [start, end).
+
+        Common aggregates are computed for all windows at once.
+        Other aggregates, and unsorted indexes, are handled a window at a time.
+
+        Parameters
+        ----------
+        starts: np.array
+            window starts, in nanoseconds
+
+        ends: np.array
+            window ends, in nanoseconds
+
+        rows: (np.array, np.array) or None
+            the rows of each window, from `_slice_rows`
+
+        padded: np.array or None
+            (optional) the data from `_padded`, if it is already built
+
+        Returns
+        -------
+        np.array
+            one row of aggregated data per window
+        """
+        shape = (len(starts), len(self.data.columns))
+
+        if rows is None:
+            index = self.data.index.asi8
+            aggregated = [
+                self.aggregate(self.data[(start <= index) & (index < end)], axis=0)
+                for start, end in zip(starts, ends)
+            ]
+            return np.reshape(np.array(aggregated), shape)
+
+        lo, hi = rows
+        reducer = _SEGMENT_REDUCERS.get(self.aggregate)
+        if reducer is not None and len(starts):
+            if padded is None:
+                padded = _padded(self.data.values)
+            if padded is not None:
+                return reducer(padded, lo, hi)
+
+        aggregated = [
+            self.aggregate(self.data.iloc[start:end], axis=0)
+            for start, end in zip(lo, hi)
+        ]
+        return np.reshape(np.array(aggregated), shape)
+
+
+def _padded(values):
+    """
+    The values with a row of missing values after them, as the segment reducers take them.
+    The padding makes every end of a run a valid row, including the end of the data.
+    None if the values are not floats, or have missing values, which pandas skips.
+    """
+    if values.dtype.kind != 'f' or np.isnan(values).any():
+        return None
+    padding = np.full((1, values.shape[1]), np.nan, dtype=values.dtype)
+    return np.vstack([values, padding])
+
+
+def _reduce_segments(ufunc, padded, lo, hi, dtype=None):
+    """
+    Reduce each run of rows padded[lo:hi] with a ufunc, in one call to `ufunc.reduceat`.
+    Runs may be empty, overlap or come in any order.
+    Returns the reductions, and a mask of the runs that are empty.
+    """
+    indices = np.empty(2 * len(lo), dtype=np.intp)
+    indices[0::2] = lo
+    indices[1::2] = hi
+    # Even entries reduce each run; odd entries reduce the gaps between runs.
+    reduced = ufunc.reduceat(padded, indices, axis=0, dtype=dtype)[0::2]
+    return reduced, lo >= hi
+
+
+def _segment_sum(padded, lo, hi):
+    # Accumulate in double precision, as pandas does.
+    reduced, empty = _reduce_segments(np.add, padded, lo, hi, dtype=np.float64)
+    reduced[empty] = 0
+    return reduced
+
+
+def _segment_mean(padded, lo, hi):
+    reduced, empty = _reduce_segments(np.add, padded, lo, hi, dtype=np.float64)
+    reduced /= np.maximum(hi - lo, 1)[:, np.newaxis]
+    reduced[empty] = np.nan
+    return reduced
+
+
+def _segment_extreme(ufunc, padded, lo, hi):
+    reduced, empty = _reduce_segments(ufunc, padded, lo, hi)
+    reduced[empty] = np.nan
+    return reduced
+
+
+def _segment_var(padded, lo, hi):
+    # Shift by the overall mean first, so that the sums of squares keep their precision.
+    shifted = padded - padded[:-1].mean(axis=0, dtype=np.float64)
+    mean = _segment_mean(shifted, lo, hi)
+    squares = _segment_mean(np.square(shifted, out=shifted), lo, hi)
+    return np.maximum(squares - mean**2, 0)
+
+
+def _segment_std(padded, lo, hi):
+    return np.sqrt(_segment_var(padded, lo, hi))
+
+
+def _segment_end(first, padded, lo, hi):
+    # Empty runs take the row of missing values past the end of the data.
+    position = np.where(lo < hi, lo if first else hi - 1, len(padded) - 1)
+    return padded[position]
+
+
+def first(data, axis=0):
+    """
+    The first row of a data frame, or missing values if it is empty.
+    """
+    if len(data):
+        return data.iloc[0]
+    return pd.Series(np.nan, index=data.columns)
+
 
-class FeatureCollection(dict):
+def last(data, axis=0):
+    """
+    The last row of a data frame, or missing values if it is empty.
+    """
+    if len(data):
+        return data.iloc[-1]
+    return pd.Series(np.nan, index=data.columns)
+
+
+# Aggregates that can be requested by name
+AGGREGATES = {
+    'mean': np.mean,
+    'sum': np.sum,
+    'max': np.max,
+    'min': np.min,
+    'std': np.std,
+    'var': np.var,
+    'median': np.median,
+    'first': first,
+    'last': last,
+}
+
+# Aggregates that can be computed for every window at once
+_SEGMENT_REDUCERS = {
+    np.mean: _segment_mean,
+    np.sum: _segment_sum,
+    np.max: partial(_segment_extreme, np.maximum),
+    np.min: partial(_segment_extreme, np.minimum),
+    np.std: _segment_std,
+    np.var: _segment_var,
+    first: partial(_segment_end, True),
+    last: partial(_segment_end, False),
+}
+
+
+def _aggregate_function(aggregate):
+    """
+    Gets an aggregate function from its name in AGGREGATES, or as it is.
+    """
+    if isinstance(aggregate, six.string_types):
+        if aggregate not in AGGREGATES:
+            raise FeatureError('Unknown aggregate: {0}'.format(aggregate))
+        return AGGREGATES[aggregate]
+    return aggregate
+
+
+def _aggregate_name(aggregate):
+    """
+    Gets the name of an aggregate, for its key in a FeatureCollection.
+    """
+    if isinstance(aggregate, six.string_types):
+        return aggregate
+    for name, function in AGGREGATES.items():
+        if function is aggregate:
+            return name
+    return aggregate.__name__
+
+
+class PrefixSums(object):
+    """
+    Running totals of the rows of a feature, from which the sum, mean and variance
+    of any run of rows take constant time.
+
+    Each column is shifted by its mean before it is summed, so that the totals
+    keep their precision.  Missing values are skipped, as pandas does.
+
+    Attributes
+    ----------
+        counts: np.array [shape=(rows + 1, columns)]
+            number of values before each row
+        sums: np.array [shape=(rows + 1, columns)]
+            sum of the shifted values before each row
+        squares: np.array [shape=(rows + 1, columns)]
+            sum of the squared shifted values before each row
+        shift: np.array [shape=(columns,)]
+            the value each column is shifted by
+    """
+
+    def __init__(self, values):
+        """
+        Build the running totals, in one pass over the values.
+
+        Parameters
+        ----------
+        values: np.array [shape=(rows, columns)]
+            the data to total
+        """
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        totals = np.where(present, values, 0.0).sum(axis=0)
+        self.shift = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+
+        shifted = np.where(present, values - self.shift, 0.0)
+        self.counts = _running_total(present)
+        self.sums = _running_total(shifted)
+        self.squares = _running_total(shifted**2)
+
+    def _totals(self, lo, hi):
+        """
+        Count, sum and sum of squares of the shifted values in each run of rows [lo, hi).
+        """
+        return (
+            self.counts[hi] - self.counts[lo],
+            self.sums[hi] - self.sums[lo],
+            self.squares[hi] - self.squares[lo],
+        )
+
+    def sum(self, lo, hi):
+        """
+        Sum of each run of rows [lo, hi).
+        """
+        counts, sums, _ = self._totals(lo, hi)
+        return sums + counts * self.shift
+
+    def mean(self, lo, hi):
+        """
+        Mean of each run of rows [lo, hi).
+        """
+        counts, sums, _ = self._totals(lo, hi)
+        with np.errstate(invalid='ignore'):
+            return sums / counts + self.shift
+
+    def var(self, lo, hi):
+        """
+        Population variance of each run of rows [lo, hi).
+        """
+        counts, sums, squares = self._totals(lo, hi)
+        with np.errstate(invalid='ignore'):
+            mean = sums / counts
+            return np.maximum(squares / counts - mean**2, 0)
+
+    def std(self, lo, hi):
+        """
+        Population standard deviation of each run of rows [lo, hi).
+        """
+        return np.sqrt(self.var(lo, hi))
+
+
+def _running_total(values):
+    """
+    Cumulative sums down the rows, starting from a row of zeros.
+    """
+    totals = np.zeros((len(values) + 1,) + values.shape[1:], dtype=np.float64)
+    np.cumsum(values, axis=0, dtype=np.float64, out=totals[1:])
+    return totals
+
+
+class FeatureCollection(LazyDict):
     """
     A dictionary of features.
 
     Delegates `.at` to the features it contains.
+    Features can be registered with `set_lazy`, and are only computed when first accessed.
 
     Allows for selection of multiple keys, which returns a smaller feature collection.
     """
 
-    def at(self, time_slices):
+    def at(self, time_slices, aggregates=None):
         """
         Resample each feature at a new time slice index.
 
@@ -148,27 +703,26 @@ class FeatureCollection(dict):
         time_slices : TimeSlice or TimeSlice collection
             The time slices at which to index this feature object
 
+        aggregates : list [strings or functions]
+            (optional) several aggregates to resample each feature with at once.
+            See `Feature.at`.
+
         Returns
         -------
         new_features : FeatureCollection
-            The resampled feature data
+            The resampled feature data.  With `aggregates`, each key holds
+            a FeatureCollection of the resampled data, keyed by aggregate.
         """
         new_features = FeatureCollection()
         for key in self.keys():
-            new_features[key] = self[key].at(time_slices)
+            new_features[key] = self[key].at(time_slices, aggregates)
         return new_features
 
     def __iter__(self):
         """
         Wrapper to avoid making the user deal with parallel lists
         """
-        key = list(self.keys())[0]
-        length = len(self[key])
-        for i in range(length):
-            res = {}
-            for key, feature in self.items():
-                res[key] = feature.data[feature.name][i]
-            yield res
+        return self._rows()
 
     def __len__(self):
         """
@@ -183,17 +737,78 @@ class FeatureCollection(dict):
         Allows iteration over a time-indexed feature and the associated timeslices.
         """
         key = list(self.keys())[0]
-        length = len(self[key])
         time_slices = self[key].time_slices
 
         if time_slices is None:
             raise FeatureError("FeatureCollection has no time reference.")
 
-        for i in range(length):
-            res = {}
-            for key, feature in self.items():
-                res[key] = feature.data[feature.name][i]
-            yield (time_slices[i], res)
+        for time_slice, row in zip(time_slices, self._rows()):
+            yield (time_slice, row)
+
+    def _rows(self):
+        """
+        Generates a dict of every key's value for each row.
+        Each feature's data is read out once, as an array,
+        and a nested FeatureCollection gives a dict for each of its rows.
+        """
+        keys = list(self.keys())
+        columns = [
+            (
+                list(feature)
+                if isinstance(feature, FeatureCollection)
+                else _values(feature)
+            )
+            for feature in self.values()
+        ]
+        for row in zip(*columns):
+            yield dict(zip(keys, row))
+
+    def _columns(self):
+        """
+        Gets each feature's data as an array, with its key.
+        A nested FeatureCollection gives one array for each of its keys,
+        keyed "<key>.<nested key>".
+        """
+        columns = []
+        for key, feature in self.items():
+            if isinstance(feature, FeatureCollection):
+                columns.extend(
+                    ('%s.%s' % (key, nested_key), column)
+                    for nested_key, column in feature._columns()
+                )
+            else:
+                columns.append((key, _values(feature)))
+        return columns
+
+    def as_matrix(self):
+        """
+        Get the data of every feature as one array.
+
+        Returns
+        -------
+        np.array
+            one row per time, and one column per key, in the order of `keys()`.
+            A nested FeatureCollection gives one column for each of its keys.
+        """
+        columns = [column for _, column in self._columns()]
+        if not columns:
+            return np.zeros((0, 0))
+        return np.column_stack(columns)
+
+    def to_records(self):
+        """
+        Get the data of every feature as a record array.
+
+        Returns
+        -------
+        np.recarray
+            one record per time, with a field for each key.
+            A nested FeatureCollection gives a field "<key>.<nested key>" for each of its keys.
+        """
+        columns = self._columns()
+        return np.rec.fromarrays(
+            [column for _, column in columns], names=[key for key, _ in columns]
+        )
 
     def get(self, keys):
         """
@@ -217,3 +832,159 @@ class FeatureCollection(dict):
             if key in self:
                 new_features[key] = self[key]
         return new_features
+
+
+class MatrixFeatureCollection(FeatureCollection):
+    """
+    A FeatureCollection of the columns of one multi-column Feature,
+    such as the 12 chroma bins or the MFCCs of timbre.
+
+    The data is held once, as a (frames x columns) DataFrame with a shared time index.
+    Each key gives a single-column Feature that views one column, and resampling
+    and iteration work on the whole matrix at once.
+
+    Attributes
+    ----------
+        feature: Feature
+            the Feature holding every column
+        aliases: dict
+            other keys for some of the columns, keyed by alias
+        column_name: string
+            the name of the data column in each key's Feature,
+            or None to use the name of the matrix column
+    """
+
+    def __init__(self, feature, aliases=None, column_name=None):
+        """
+        Constructor for a matrix-backed feature collection
+
+        Parameters
+        ----------
+        feature: Feature
+            a Feature with one uniquely-named column per key
+
+        aliases: dict
+            (optional) extra keys, mapping each alias to a column name
+
+        column_name: string
+            (optional) the name of the data column in each key's Feature,
+            when it should differ from the name of the matrix column
+
+        Returns
+        ------
+        A MatrixFeatureCollection object
+        """
+        FeatureCollection.__init__(self)
+        self.feature = feature
+        self.aliases = dict(aliases or {})
+        self.column_name = column_name
+        for column in feature.data.columns:
+            self.set_lazy(column, partial(self._column, column))
+        for alias, column in self.aliases.items():
+            self.set_lazy(alias, partial(self._column, column))
+
+    def __repr__(self):
+        return '<MatrixFeatureCollection, {0}>'.format(', '.join(self.keys()))
+
+    def _column(self, column):
+        """
+        A single-column Feature viewing one column of the matrix.
+        """
+        feature = self.feature
+        base = None
+        if feature.base is not None:
+            base = self._with_feature(feature.base)[column]
+        data = _column_view(feature.data, column)
+        if self.column_name is not None:
+            data.columns = [self.column_name]
+        return Feature(
+            data=data,
+            aggregate=feature.aggregate,
+            base=base,
+            time_slices=feature.time_slices,
+            frame_index=feature.frame_index,
+        )
+
+    def at(self, time_slices, aggregates=None):
+        """
+        Resample every column at a new time slice index, in one pass over the matrix.
+
+        Parameters
+        ----------
+        time_slices : TimeSlice or TimeSlice collection
+            The time slices at which to index this feature object
+
+        aggregates : list [strings or functions]
+            (optional) several aggregates to resample with at once.
+            See `Feature.at`.
+
+        Returns
+        -------
+        new_features : MatrixFeatureCollection
+            The resampled feature data.  With `aggregates`, a FeatureCollection
+            of a MatrixFeatureCollection for each aggregate, keyed by its name.
+        """
+        if aggregates is None:
+            return self._with_feature(self.feature.at(time_slices))
+
+        new_features = FeatureCollection()
+        for name, feature in self.feature.at(time_slices, aggregates).items():
+            new_features[name] = self._with_feature(feature)
+        return new_features
+
+    def _with_feature(self, feature):
+        """
+        A MatrixFeatureCollection of another matrix, with the same keys.
+        """
+        return MatrixFeatureCollection(feature, self.aliases, self.column_name)
+
+    def _rows(self):
+        """
+        Generates a dict of every key's value for each row of the matrix.
+        """
+        keys = list(self.keys())
+        for row in self.feature.data.values[:, self._positions(keys)]:
+            yield dict(zip(keys, row))
+
+    def _columns(self):
+        """
+        Gets each column of the matrix, with its key.
+        """
+        keys = list(self.keys())
+        values = self.feature.data.values
+        return [
+            (key, values[:, position])
+            for key, position in zip(keys, self._positions(keys))
+        ]
+
+    def _positions(self, keys):
+        """
+        Gets the position in the matrix of the column for each key.
+        """
+        columns = self.feature.data.columns
+        return [columns.get_loc(self.aliases.get(key, key)) for key in keys]
+
+    def __len__(self):
+        """
+        Wrapper to avoid making the user deal with parallel lists
+        """
+        return len(self.feature.data)
+
+    def __reduce__(self):
+        # Pickle the matrix once, rather than a copy of it for each column.
+        return (self.__class__, (self.feature, self.aliases, self.column_name))
+
+
+def _values(feature):
+    """
+    The data of a single-column Feature, as an array.
+    """
+    return feature.data[feature.name].values
+
+
+def _column_view(data, column):
+    """
+    A single-column DataFrame of `data`, sharing its memory where pandas allows.
+    """
+    position = data.columns.get_loc(column)
+    return data.iloc[:, position : position + 1]
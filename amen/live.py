@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''Live analysis of audio that arrives a block at a time'''
+
+import numpy as np
+
+import librosa
+
+from .audio import Audio
+from .streaming import StreamAnalyzer
+from .utils import LazyDict
+
+# Features a LiveAudio provides.  Tempo needs the whole track, so is not one of them.
+LIVE_FEATURE_NAMES = ('centroid', 'amplitude', 'timbre', 'chroma', 'onset_strength')
+
+# Frame-level results kept in the ring buffer, keyed by StreamAnalyzer result name
+_FRAME_RESULTS = {
+    'centroid': 'centroid',
+    'amplitude': 'amplitude',
+    'timbre': 'timbre',
+    'chroma': 'chroma',
+    'onset_strength': 'onset_envelope',
+    'beat_envelope': 'beat_envelope',
+}
+
+
+class LiveAudio(Audio):
+    """
+    Audio that grows as blocks of samples are appended, from a capture callback
+    or a file that is still being written.
+
+    Only the most recent `buffer_duration` seconds are kept.  Each call to `append`
+    analyses just the new frames:  frame features come from a `StreamAnalyzer`,
+    onsets are picked from the new part of the onset envelope, and beats are
+    re-tracked over the last `beat_window` seconds only.  `features` and `timings`
+    always cover the buffer, in the time base of the whole stream, so `offset`
+    is the time of the oldest buffered sample.
+
+    Samples and frame results are kept in ring buffers of fixed capacity,
+    so appending a block costs the same however long the stream has run.
+    `raw_samples`, and each feature, are copied out of the buffers when first read
+    after an `append`, so a Feature or array already read is a snapshot
+    that later blocks do not change.  Read them again to see new frames.
+    A TimeSlice keeps its time in the stream, so once `offset` has moved past
+    its start, its samples are gone, and `get_samples` raises AudioError.
+
+    As with streaming analysis, chroma is computed from the STFT,
+    and decibel scaling is not clipped to the loudest frame.
+
+    Attributes
+    ----------
+        buffer_duration: float
+            maximum duration kept, in seconds
+        beat_window: float
+            duration of the most recent audio that beats are re-tracked over, in seconds
+    """
+
+    def __init__(
+        self,
+        sample_rate=22050,
+        num_channels=1,
+        buffer_duration=60.0,
+        beat_window=8.0,
+        dtype=None,
+    ):
+        """
+        LiveAudio constructor.  Starts with no samples.
+
+        Parameters
+        ----------
+
+        sample_rate: number > 0 [scalar]
+            (optional) sample rate of the appended samples.  Analysis runs at this rate,
+            with a hop length that keeps the usual analysis frame rate.
+
+        num_channels: integer, 1 or 2
+            (optional) number of channels of the appended samples
+
+        buffer_duration: number > 0 [scalar]
+            (optional) seconds of audio, and of analysis, to keep
+
+        beat_window: number > 0 [scalar]
+            (optional) seconds of the most recent onset envelope to track beats over
+
+        dtype: numpy dtype
+            (optional) dtype for samples and feature data
+
+        Returns
+        ------
+        A LiveAudio object
+        """
+        self._set_attributes(
+            convert_to_mono=num_channels == 1,
+            analysis_sample_rate=sample_rate,
+            dtype=dtype,
+            feature_names=LIVE_FEATURE_NAMES,
+        )
+        self.sample_rate = float(sample_rate)
+        self.hop_length = int(round(512 * self.sample_rate / 22050))
+        self.n_fft = 4 * self.hop_length
+        self.num_channels = num_channels
+        self.buffer_duration = buffer_duration
+        self.beat_window = beat_window
+        self.duration = 0.0
+
+        self._analyzer = StreamAnalyzer(
+            self.sample_rate,
+            hop_length=self.hop_length,
+            n_fft=self.n_fft,
+            fmax=256.0 * self.sample_rate / self.hop_length,
+        )
+        # Ring buffers of samples and of frame results; frame 0 is at `offset`.
+        # The analyzer holds back less than n_fft samples that no frame covers yet.
+        self._max_frames = max(
+            1, int(buffer_duration * self.sample_rate / self.hop_length)
+        )
+        self._samples = _RingBuffer(
+            (num_channels,),
+            self._max_frames * self.hop_length + self.n_fft,
+            dtype or np.float32,
+        )
+        self._frames = {}
+        self._first_frame = 0
+        self._onset_range = (np.inf, -np.inf)
+        # Onset and beat positions, in frames since the start of the stream
+        self._onset_frames = np.zeros(0, dtype=int)
+        self._onsets_checked = 0
+        self._beat_frames = np.zeros(0, dtype=int)
+
+        # librosa's onset_detect defaults, in frames
+        frame_rate = self.sample_rate / self.hop_length
+        self._peak_params = {
+            'pre_max': int(0.03 * frame_rate),
+            'post_max': int(0.00 * frame_rate) + 1,
+            'pre_avg': int(0.10 * frame_rate),
+            'post_avg': int(0.10 * frame_rate) + 1,
+            'wait': int(0.03 * frame_rate),
+            'delta': 0.07,
+        }
+
+        self._update()
+
+    def __repr__(self):
+        args = self.offset, self.duration
+        return '<LiveAudio, offset: {0:.2f}, duration: {1:.2f}>'.format(*args)
+
+    def append(self, samples):
+        """
+        Add a block of samples, and analyse the frames it completes.
+
+        Parameters
+        ----------
+        samples: np.array
+            the next samples: 1-D for mono, or one row per channel
+        """
+        samples = np.atleast_2d(samples)
+        if len(samples) != self.num_channels:
+            samples = np.repeat(
+                samples.mean(axis=0, keepdims=True), self.num_channels, 0
+            )
+        self._samples.append(samples)
+
+        results = self._analyzer.process(librosa.to_mono(samples).astype(np.float32))
+        if len(results['onset_envelope']):
+            # Normalise onsets by the range seen so far, as onset_detect does for a whole track.
+            self._onset_range = (
+                min(self._onset_range[0], results['onset_envelope'].min()),
+                max(self._onset_range[1], results['onset_envelope'].max()),
+            )
+        for name, key in _FRAME_RESULTS.items():
+            value = self._as_dtype(results[key])
+            if name not in self._frames:
+                self._frames[name] = _RingBuffer(
+                    value.shape[:-1], self._max_frames, value.dtype
+                )
+            self._frames[name].append(value)
+        self._first_frame = self._end_frame - len(self._frames['amplitude'])
+
+        self._update_onsets()
+        self._update_beats()
+        self._trim()
+        self._update()
+
+    @property
+    def _end_frame(self):
+        """
+        Frames analysed since the start of the stream.
+        """
+        return self._analyzer.frames
+
+    def _update_onsets(self):
+        """
+        Pick onsets in the frames that now have enough frames after them to be final.
+        """
+        envelope = self._frames['onset_strength'].view()
+        lookahead = self._peak_params['post_avg'] + self._peak_params['post_max']
+        final = self._end_frame - lookahead
+        if final <= self._onsets_checked:
+            return
+
+        low, high = self._onset_range
+        context = self._peak_params['pre_avg'] + self._peak_params['pre_max']
+        start = max(self._onsets_checked - context, self._first_frame)
+        window = envelope[start - self._first_frame :]
+        window = (window - low) / max(high - low, np.finfo(float).tiny)
+
+        params = dict(self._peak_params, wait=0)
+        peaks = librosa.util.peak_pick(window, **params)
+        peaks = librosa.onset.onset_backtrack(peaks, window) + start
+        peaks = peaks[(peaks >= self._onsets_checked) & (peaks < final)]
+
+        onsets = list(self._onset_frames)
+        for peak in peaks:
+            if not onsets or peak - onsets[-1] > self._peak_params['wait']:
+                onsets.append(peak)
+        self._onset_frames = np.array(onsets, dtype=int)
+        self._onsets_checked = final
+
+    def _update_beats(self):
+        """
+        Re-track beats over the most recent `beat_window` seconds of the onset envelope.
+        Earlier beats are kept as they are.
+        """
+        window_frames = int(self.beat_window * self.sample_rate / self.hop_length)
+        start = max(self._end_frame - window_frames, self._first_frame)
+        envelope = self._frames['beat_envelope'].view()[start - self._first_frame :]
+        if len(envelope) < 2:
+            return
+
+        tempo, beats = librosa.beat.beat_track(
+            onset_envelope=envelope,
+            sr=self.sample_rate,
+            hop_length=self.hop_length,
+            trim=False,
+        )
+        beats = np.asarray(beats, dtype=int) + start
+
+        kept = self._beat_frames[self._beat_frames < start]
+        if len(kept) and tempo > 0:
+            # Drop re-tracked beats too close to the last kept one.
+            half_period = 30.0 * self.sample_rate / (self.hop_length * tempo)
+            beats = beats[beats - kept[-1] > half_period]
+        self._beat_frames = np.concatenate([kept, beats])
+
+    def _trim(self):
+        """
+        Drop the samples, onsets and beats before the oldest buffered frame.
+        The ring buffers have already dropped the frames themselves.
+        """
+        self._samples.keep(self._samples.end - self._first_frame * self.hop_length)
+        self._onset_frames = self._onset_frames[self._onset_frames >= self._first_frame]
+        self._beat_frames = self._beat_frames[self._beat_frames >= self._first_frame]
+
+    @property
+    def raw_samples(self):
+        """
+        The buffered samples, with one row per channel.
+        Copied out of the ring buffer on first access after each `append`.
+        """
+        if self._raw_samples is None:
+            self._raw_samples = self._samples.view().copy()
+        return self._raw_samples
+
+    def _update(self):
+        """
+        Rebuilds the analysis, features and timings from the buffers.
+        Features and timings are built on first access, as for Audio.
+        """
+        self.offset = self._first_frame * self.hop_length / self.sample_rate
+        self.duration = len(self._samples) / self.sample_rate
+        self._raw_samples = None
+        self._analysis_samples = None
+        self._zero_indexes = None
+
+        analysis = LazyDict()
+        for name in self.feature_names:
+            if name in self._frames:
+                analysis.set_lazy(name, self._frames[name].copy)
+            else:
+                analysis[name] = np.zeros((1, 0))
+        for name, frames in (
+            ('beats', self._beat_frames),
+            ('segments', self._onset_frames),
+        ):
+            analysis[name] = librosa.frames_to_time(
+                frames - self._first_frame,
+                sr=self.sample_rate,
+                hop_length=self.hop_length,
+            )
+        self._analysis = analysis
+        self.features = self._create_features()
+        self.timings = self._create_timings()
+
+
+class _RingBuffer(object):
+    """
+    The most recent values along the last axis of an array, up to a fixed capacity.
+
+    Every value is stored twice, `capacity` apart, so the buffered values
+    are always one contiguous slice, and appending never moves the old ones.
+    """
+
+    def __init__(self, shape, capacity, dtype):
+        self.capacity = capacity
+        # Values appended since the buffer was created
+        self.end = 0
+        self._data = np.zeros(tuple(shape) + (2 * capacity,), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, values):
+        """
+        Add values at the end, dropping the oldest values beyond the capacity.
+        """
+        count = values.shape[-1]
+        skipped = max(count - self.capacity, 0)
+        values = values[..., skipped:]
+        head = (self.end + skipped) % self.capacity
+        first = min(values.shape[-1], self.capacity - head)
+        for start in (0, self.capacity):
+            self._data[..., start + head : start + head + first] = values[..., :first]
+            self._data[..., start : start + values.shape[-1] - first] = values[
+                ..., first:
+            ]
+        self.end += count
+        self._size = min(self._size + count, self.capacity)
+
+    def keep(self, size):
+        """
+        Drop the oldest values, keeping at most `size`.
+        """
+        self._size = max(min(self._size, size), 0)
+
+    def view(self):
+        """
+        The buffered values, oldest first.  Later appends overwrite this view.
+        """
+        start = (self.end - self._size) % self.capacity
+        return self._data[..., start : start + self._size]
+
+    def copy(self):
+        """
+        A copy of the buffered values, oldest first.
+        """
+        return self.view().copy()
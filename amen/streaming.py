@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''Block-by-block analysis, for audio that should not be held in memory'''
+
+import numpy as np
+import soundfile as sf
+
+import librosa
+
+
+class StreamAnalyzer(object):
+    """
+    Incremental frame-level analysis of a stream of mono samples.
+
+    Blocks of any length can be passed to `process`; each call analyses
+    every frame that the samples seen so far complete, and keeps the rest.
+    Frames are aligned with librosa's centered analysis, so frame `t` covers
+    the samples around `t * hop_length`.
+
+    Compared to the analysis in `Audio`:
+        - chroma is computed from the STFT, not the constant-Q transform
+        - decibel scaling is not clipped to the loudest frame, as no frame
+          is known to be the loudest until the stream ends
+
+    Attributes
+    ----------
+        sample_rate: number
+            sample rate of the stream
+        hop_length: integer
+            number of samples between frames
+        n_fft: integer
+            length of each analysis frame
+        frames: integer
+            number of frames analysed so far
+    """
+
+    def __init__(self, sample_rate, hop_length=512, n_fft=2048, n_mfcc=12, fmax=None):
+        """
+        StreamAnalyzer constructor.
+
+        Parameters
+        ----------
+
+        sample_rate: number > 0 [scalar]
+            sample rate of the stream
+
+        hop_length: integer > 0
+            (optional) number of samples between frames
+
+        n_fft: integer > 0
+            (optional) length of each analysis frame
+
+        n_mfcc: integer > 0
+            (optional) number of MFCCs to compute
+
+        fmax: number > 0 [scalar]
+            (optional) highest frequency of the mel filters.  Defaults to `sample_rate / 2`.
+
+        Returns
+        ------
+        A StreamAnalyzer object
+        """
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.n_mfcc = n_mfcc
+        self.frames = 0
+
+        self._mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, fmax=fmax)
+        self._chroma_basis = librosa.filters.chroma(
+            sr=sample_rate, n_fft=n_fft, tuning=0.0
+        )
+
+        # Start with half a frame of silence, as librosa's centered analysis does.
+        self._buffer = np.zeros(n_fft // 2, dtype=np.float32)
+        self._previous_log_mel = None
+
+        # librosa delays the onset envelope by one frame for the difference,
+        # and by half a frame for centering.
+        delay = 1 + n_fft // (2 * hop_length)
+        self._onsets = np.zeros((2, delay), dtype=np.float32)
+
+    def __repr__(self):
+        args = self.sample_rate, self.frames
+        return '<StreamAnalyzer, sample rate: {0}, frames: {1}>'.format(*args)
+
+    def process(self, y):
+        """
+        Analyse a block of mono samples.
+
+        Parameters
+        ----------
+        y: np.array
+            the next samples in the stream
+
+        Returns
+        -------
+        dict
+            arrays of the newly completed frames, keyed by
+            'centroid', 'amplitude', 'timbre', 'chroma',
+            'onset_envelope' (mean aggregated) and
+            'beat_envelope' (median aggregated, as used for beat tracking).
+            Frame-level features are N by T arrays, envelopes have length T.
+        """
+        buffer = np.concatenate([self._buffer, y])
+        if len(buffer) < self.n_fft:
+            self._buffer = buffer
+            return self._analyse(buffer[:0])
+
+        n_frames = 1 + (len(buffer) - self.n_fft) // self.hop_length
+        used = (n_frames - 1) * self.hop_length + self.n_fft
+        results = self._analyse(buffer[:used])
+        self._buffer = buffer[n_frames * self.hop_length :]
+        return results
+
+    def finish(self):
+        """
+        Analyse the frames that end after the last samples of the stream.
+
+        Returns
+        -------
+        dict
+            as for `process`
+        """
+        padding = np.zeros(self.n_fft // 2, dtype=self._buffer.dtype)
+        return self.process(padding)
+
+    def _analyse(self, y):
+        """
+        Analyse the samples for a whole number of frames.
+        """
+        if len(y) == 0:
+            S = np.zeros((1 + self.n_fft // 2, 0), dtype=np.float32)
+            amplitude = np.zeros((1, 0), dtype=np.float32)
+        else:
+            S = np.abs(
+                librosa.stft(
+                    y, n_fft=self.n_fft, hop_length=self.hop_length, center=False
+                )
+            )
+            amplitude = librosa.feature.rms(
+                y=y, frame_length=self.n_fft, hop_length=self.hop_length, center=False
+            )
+
+        power = S**2
+        log_mel = librosa.power_to_db(self._mel_basis.dot(power), top_db=None)
+
+        results = {}
+        results['amplitude'] = amplitude
+        if S.shape[1]:
+            results['centroid'] = librosa.feature.spectral_centroid(
+                S=S, sr=self.sample_rate, n_fft=self.n_fft
+            )
+            results['timbre'] = librosa.feature.mfcc(S=log_mel, n_mfcc=self.n_mfcc)
+        else:
+            results['centroid'] = np.zeros((1, 0), dtype=np.float32)
+            results['timbre'] = np.zeros((self.n_mfcc, 0), dtype=np.float32)
+        results['chroma'] = librosa.util.normalize(
+            self._chroma_basis.dot(power), norm=np.inf, axis=0
+        )
+
+        results['onset_envelope'], results['beat_envelope'] = self._onset(log_mel)
+        self.frames += S.shape[1]
+        return results
+
+    def _onset(self, log_mel):
+        """
+        Onset strength for new frames, from the positive spectral flux.
+        """
+        if self._previous_log_mel is None:
+            reference = log_mel[:, :-1]
+            current = log_mel[:, 1:]
+        else:
+            reference = np.hstack([self._previous_log_mel, log_mel[:, :-1]])
+            current = log_mel
+        if log_mel.shape[1]:
+            self._previous_log_mel = log_mel[:, -1:]
+
+        flux = np.maximum(0.0, current - reference)
+        onsets = np.vstack([flux.mean(axis=0), np.median(flux, axis=0)])
+        onsets = np.hstack([self._onsets, onsets.astype(self._onsets.dtype)])
+
+        n_frames = log_mel.shape[1]
+        self._onsets = onsets[:, n_frames:]
+        return onsets[0, :n_frames], onsets[1, :n_frames]
+
+
+def stream_analysis(
+    file_path,
+    hop_length=512,
+    n_fft=2048,
+    block_size=2**16,
+    n_mfcc=12,
+    fmax=None,
+    start=0,
+    frames=-1,
+):
+    """
+    Analyse an audio file block by block, at its own sample rate.
+    Only one block of samples is held in memory at a time.
+
+    Parameters
+    ----------
+    file_path: string
+        path to the audio file to analyse
+
+    hop_length: integer > 0
+        (optional) number of samples between frames
+
+    n_fft: integer > 0
+        (optional) length of each analysis frame
+
+    block_size: integer > 0
+        (optional) number of samples to read at a time
+
+    n_mfcc: integer > 0
+        (optional) number of MFCCs to compute
+
+    fmax: number > 0 [scalar]
+        (optional) highest frequency of the mel filters
+
+    start: integer >= 0
+        (optional) first sample to analyse
+
+    frames: integer
+        (optional) number of samples to analyse, or -1 for the rest of the file
+
+    Returns
+    -------
+    dict
+        arrays for the analysed samples, keyed as for `StreamAnalyzer.process`
+    """
+    sample_rate = sf.info(file_path).samplerate
+    analyzer = StreamAnalyzer(
+        sample_rate, hop_length=hop_length, n_fft=n_fft, n_mfcc=n_mfcc, fmax=fmax
+    )
+
+    results = {}
+    blocks = sf.blocks(
+        file_path,
+        blocksize=block_size,
+        dtype='float32',
+        always_2d=True,
+        start=start,
+        frames=frames,
+    )
+    for block in blocks:
+        _append(results, analyzer.process(block.mean(axis=1)))
+    _append(results, analyzer.finish())
+
+    return {name: np.concatenate(parts, axis=-1) for name, parts in results.items()}
+
+
+def _append(results, new_results):
+    for name, value in new_results.items():
+        results.setdefault(name, []).append(value)
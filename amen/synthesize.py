@@ -3,6 +3,7 @@
 '''Audio synthesis'''
 
 import types
+import numpy as np
 import pandas as pd
 from scipy.sparse import lil_matrix
 
@@ -10,6 +11,7 @@ import librosa
 
 from .audio import Audio
 from .exceptions import SynthesizeError
+from .timing import TimingList
 
 
 def _format_inputs(inputs):
@@ -23,7 +25,7 @@ def _format_inputs(inputs):
         - A generator that returns (TimeSlice, start_time).
         - A tuple of (TimeSlices, start_times).
     """
-    if isinstance(inputs, list):
+    if isinstance(inputs, (list, TimingList)):
         time_index = pd.to_timedelta(0.0, 's')
         timings = []
         for time_slice in inputs:
@@ -55,22 +57,31 @@ def synthesize(inputs):
     An Audio object
     """
     # First we organize our inputs.
-    inputs = _format_inputs(inputs)
+    inputs = list(_format_inputs(inputs))
+
+    # Then we find the zero-crossing-aligned samples of every slice at once.
+    time_slices = TimingList('synthesize', [], None)
+    time_slices.extend(time_slice for time_slice, _ in inputs)
+    starting_samples, sample_starts, sample_ends = time_slices.sample_plan()
+    sample_offsets = sample_starts - starting_samples[:, np.newaxis]
 
     max_time = 0.0
     sample_rate = 44100
     array_length = 20 * 60  # 20 minutes!
     array_shape = (2, sample_rate * array_length)
-    sparse_array = lil_matrix(array_shape)
+    sparse_array = None
+    dtype = None
 
     initial_offset = 0
     for i, (time_slice, start_time) in enumerate(inputs):
-        # if we have a mono file, we return stereo here.
-        resampled_audio, left_offset, right_offset = time_slice.get_samples()
+        left_offset, right_offset = sample_offsets[i]
 
         # set the initial offset, so we don't miss the start of the array
         if i == 0:
             initial_offset = max(left_offset * -1, right_offset * -1)
+            # mix in the dtype of the first source, so float32 sources stay float32
+            dtype = time_slice.audio.dtype
+            sparse_array = lil_matrix(array_shape, dtype=dtype or np.float64)
 
         # get the target start and duration
         start_time = start_time.delta * 1e-9
@@ -92,15 +103,22 @@ def synthesize(inputs):
         left_start = starting_sample + left_offset + initial_offset
         right_start = starting_sample + right_offset + initial_offset
 
+        # if we have a mono file, we return stereo here.
+        raw_samples = time_slice.audio.raw_samples
+        right_channel = 1 if time_slice.audio.num_channels == 2 else 0
+        left_samples = raw_samples[0, sample_starts[i, 0] : sample_ends[i, 0]]
+        right_samples = raw_samples[
+            right_channel, sample_starts[i, 1] : sample_ends[i, 1]
+        ]
+
         # add the data from each channel to the array
-        sparse_array[
-            0, left_start : left_start + len(resampled_audio[0])
-        ] += resampled_audio[0]
-        sparse_array[
-            1, right_start : right_start + len(resampled_audio[1])
-        ] += resampled_audio[1]
+        sparse_array[0, left_start : left_start + len(left_samples)] += left_samples
+        sparse_array[1, right_start : right_start + len(right_samples)] += right_samples
+
+    if sparse_array is None:
+        sparse_array = lil_matrix(array_shape)
 
     max_samples = librosa.time_to_samples([max_time], sr=sample_rate)
     truncated_array = sparse_array[:, 0 : max_samples[0]].toarray()
 
-    return Audio(raw_samples=truncated_array, sample_rate=sample_rate)
+    return Audio(raw_samples=truncated_array, sample_rate=sample_rate, dtype=dtype)
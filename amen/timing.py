@@ -1,37 +1,232 @@
 #!/usr/bin/env python
 '''Timing interface'''
 
-from bisect import bisect_left, bisect_right
+import numbers
+
+try:
+    from collections.abc import MutableSequence
+except ImportError:
+    from collections import MutableSequence
 
 import numpy as np
 import pandas as pd
 
 import librosa
 
+from .exceptions import AudioError
+
+
+def zero_crossing_offsets(zero_index, starting_samples, ending_samples):
+    """
+    Find the offsets from sample boundaries to nearby zero crossings.
+    Starts move back to the last crossing before them, and ends move
+    forward to the first crossing after them.
+    Works on single samples, or on whole arrays of boundaries at once.
+
+    Parameters
+    ----------
+    zero_index: np.array
+        sorted sample positions of the zero crossings in one channel
+
+    starting_samples: int or np.array
+        the starting sample of each slice
+
+    ending_samples: int or np.array
+        the ending sample of each slice
+
+    Returns
+    -------
+    (starting_offsets, ending_offsets)
+        offsets to add to the starting and ending samples
+    """
+    starting_samples = np.asarray(starting_samples)
+    ending_samples = np.asarray(ending_samples)
+    if len(zero_index) == 0:
+        return np.zeros_like(starting_samples), np.zeros_like(ending_samples)
+
+    index = np.searchsorted(zero_index, starting_samples, side='left') - 1
+    starting_offsets = np.where(
+        index < 0, 0, zero_index[np.maximum(index, 0)] - starting_samples
+    )
+
+    index = np.searchsorted(zero_index, ending_samples, side='left')
+    zci = np.minimum(
+        np.searchsorted(zero_index, ending_samples, side='right'), len(zero_index) - 1
+    )
+    ending_offsets = np.where(
+        index >= len(zero_index), 0, zero_index[zci] - ending_samples
+    )
+
+    return starting_offsets, ending_offsets
+
+
+def zero_crossing_plan(audio, starts, durations):
+    """
+    Find the samples of many slices of one Audio at once, each moved out to
+    the zero crossings around it, as `TimeSlice.get_samples` does for one slice.
+
+    Parameters
+    ----------
+    audio: Audio
+        the audio the slices are of
+
+    starts: np.array [int64]
+        the start of each slice, in nanoseconds, in the audio's time base
+
+    durations: np.array [int64]
+        the duration of each slice, in nanoseconds
+
+    Returns
+    -------
+    (starting_samples, sample_starts, sample_ends)
+        starting_samples: np.array [shape=(slices,)]
+            the first sample of each slice, before it is moved to a zero crossing
+        sample_starts, sample_ends: np.array [shape=(slices, 2)]
+            the first sample, and the sample after the last, of each slice
+            in the left and right output channels.  These come from the audio's
+            two channels, or both from its one channel if it is mono,
+            so `audio.raw_samples[channel, start:end]` is a view of each.
+    """
+    start_times = np.asarray(starts, dtype=np.int64) * 1e-9 - audio.offset
+    end_times = start_times + np.asarray(durations, dtype=np.int64) * 1e-9
+    starting_samples = librosa.time_to_samples(start_times, sr=audio.sample_rate)
+    ending_samples = librosa.time_to_samples(end_times, sr=audio.sample_rate)
+    if len(starting_samples) and starting_samples.min() < 0:
+        raise _before_offset(audio)
+
+    sample_starts = np.empty((len(starting_samples), 2), dtype=np.int64)
+    sample_ends = np.empty((len(starting_samples), 2), dtype=np.int64)
+    for column, channel in enumerate(_output_channels(audio)):
+        starting_offsets, ending_offsets = zero_crossing_offsets(
+            audio.zero_indexes[channel], starting_samples, ending_samples
+        )
+        sample_starts[:, column] = starting_samples + starting_offsets
+        sample_ends[:, column] = ending_samples + ending_offsets
+
+    return starting_samples, sample_starts, sample_ends
+
+
+def _before_offset(audio):
+    """
+    The error for a slice that starts before the first sample an Audio holds.
+    """
+    return AudioError(
+        'Slice starts before the samples of its audio, which begin at {0:.2f}s'.format(
+            audio.offset
+        )
+    )
+
+
+def _output_channels(audio):
+    """
+    The channels of an Audio that the left and right output channels come from.
+    """
+    if audio.num_channels == 2:
+        return (0, 1)
+    return (0, 0)
+
+
+def slice_bounds(time_slices):
+    """
+    Get the start and end of each time slice, in nanoseconds.
+
+    Parameters
+    ----------
+    time_slices: iterable [TimeSlice]
+        the time slices
+
+    Returns
+    -------
+    (starts, ends)
+        int64 arrays of the start and end of each slice
+    """
+    if isinstance(time_slices, TimingList):
+        return time_slices.bounds()
+
+    starts, durations, _ = _slice_arrays(time_slices)
+    return starts, starts + durations
+
 
 class TimeSlice(object):
     """
     A slice of time:  has a start time, a duration, and a reference to an Audio object.
+
+    The start and duration are held as integer nanoseconds, and read as pandas Timedeltas.
+    Two TimeSlices are equal if they have the same start and duration in the same Audio.
     """
 
+    __slots__ = ('_time', '_duration', 'audio')
+
     def __init__(self, time, duration, audio, unit='s'):
-        self.time = pd.to_timedelta(time, unit=unit)
-        self.duration = pd.to_timedelta(duration, unit=unit)
+        self._time = pd.to_timedelta(time, unit=unit).value
+        self._duration = pd.to_timedelta(duration, unit=unit).value
         self.audio = audio
 
+    @classmethod
+    def _from_nanoseconds(cls, time, duration, audio):
+        """
+        Makes a TimeSlice from a start and duration that are already in nanoseconds.
+        """
+        time_slice = cls.__new__(cls)
+        time_slice._time = int(time)
+        time_slice._duration = int(duration)
+        time_slice.audio = audio
+        return time_slice
+
+    @property
+    def time(self):
+        """
+        The start, as a Timedelta.  Can be set to a Timedelta, or a number of seconds.
+        """
+        return pd.Timedelta(self._time)
+
+    @time.setter
+    def time(self, time):
+        self._time = pd.to_timedelta(time, unit='s').value
+
+    @property
+    def duration(self):
+        """
+        The duration, as a Timedelta.  Can be set to a Timedelta, or a number of seconds.
+        """
+        return pd.Timedelta(self._duration)
+
+    @duration.setter
+    def duration(self, duration):
+        self._duration = pd.to_timedelta(duration, unit='s').value
+
+    def __eq__(self, other):
+        if not isinstance(other, TimeSlice):
+            return NotImplemented
+        same_times = (self._time, self._duration) == (other._time, other._duration)
+        return same_times and self.audio is other.audio
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+        return hash((self._time, self._duration, id(self.audio)))
+
     def __repr__(self):
-        args = self.time.delta * 1e-9, self.duration.delta * 1e-9
+        args = self._time * 1e-9, self._duration * 1e-9
         return '<TimeSlice, start: {0:.2f}, duration: {1:.2f}>'.format(*args)
 
     def get_samples(self):
         """
         Gets the samples corresponding to this TimeSlice from the parent audio object.
+        Times count from the start of the file, so the audio's `offset` is subtracted.
+        Raises AudioError if the slice starts before `offset`.
         """
-        start = self.time.delta * 1e-9
-        duration = self.duration.delta * 1e-9
+        start = self._time * 1e-9 - self.audio.offset
+        duration = self._duration * 1e-9
         starting_sample, ending_sample = librosa.time_to_samples(
             [start, start + duration], self.audio.sample_rate
         )
+        if starting_sample < 0:
+            raise _before_offset(self.audio)
 
         left_offsets, right_offsets = self._get_offsets(
             starting_sample, ending_sample, self.audio.num_channels
@@ -53,22 +248,10 @@ class TimeSlice(object):
         """
         offsets = []
         for zero_index in self.audio.zero_indexes:
-            index = bisect_left(zero_index, starting_sample) - 1
-            if index < 0:
-                starting_offset = 0
-            else:
-                starting_crossing = zero_index[index]
-                starting_offset = starting_crossing - starting_sample
-
-            index = bisect_left(zero_index, ending_sample)
-            if index >= len(zero_index):
-                ending_offset = 0
-            else:
-                zci = min(bisect_right(zero_index, ending_sample), len(zero_index) - 1)
-                ending_crossing = zero_index[zci]
-                ending_offset = ending_crossing - ending_sample
-
-            offsets.append((starting_offset, ending_offset))
+            starting_offset, ending_offset = zero_crossing_offsets(
+                zero_index, starting_sample, ending_sample
+            )
+            offsets.append((int(starting_offset), int(ending_offset)))
 
         if num_channels == 1:
             results = (offsets[0], offsets[0])
@@ -102,16 +285,272 @@ class TimeSlice(object):
         return np.array([left_channel, right_channel])
 
 
-class TimingList(list):
+class TimingList(MutableSequence):
     """
     A list of TimeSlices.
+
+    The starts and durations of the slices are held in two int64 arrays of nanoseconds,
+    `starts` and `durations`, for code that works on every slice at once.
+    A TimeSlice is only made when a slice is read, so changing it does not change the list.
+
+    All of the methods of a list work, and slicing returns a TimingList.
+    Changing the list copies its arrays, so is cheapest done a whole list at a time,
+    for example with `extend`, slicing or `reverse`.
+
+    Attributes
+    ----------
+        name: string
+            name of the timings, for example 'beats'
+        starts: np.array [int64]
+            start of each slice, in nanoseconds
+        durations: np.array [int64]
+            duration of each slice, in nanoseconds
     """
 
     def __init__(self, name, timings, audio, unit='s'):
+        """
+        TimingList constructor
+
+        Parameters
+        ----------
+        name: string
+            name of the timings
 
-        super(self.__class__, self).__init__()
+        timings: iterable [(start, duration)]
+            the start and duration of each slice, in `unit`s
 
+        audio: Audio
+            the audio that every slice is of
+
+        unit: string
+            (optional) unit of the starts and durations, as for TimeSlice
+        """
         self.name = name
-        for (start, duration) in timings:
-            time_slice = TimeSlice(start, duration, audio, unit=unit)
-            self.append(time_slice)
+        timings = list(timings)
+        audios = np.empty(len(timings), dtype=object)
+        audios.fill(audio)
+        self._set_arrays(
+            _to_nanoseconds([start for start, _ in timings], unit),
+            _to_nanoseconds([duration for _, duration in timings], unit),
+            audios,
+        )
+
+    @classmethod
+    def _from_arrays(cls, name, starts, durations, audios):
+        """
+        Makes a TimingList that holds the given arrays.
+        """
+        timing_list = cls.__new__(cls)
+        timing_list.name = name
+        timing_list._set_arrays(starts, durations, audios)
+        return timing_list
+
+    def _set_arrays(self, starts, durations, audios):
+        """
+        Replaces the arrays.  They are made read-only, so that changes go through the list.
+        """
+        self.starts = np.array(starts, dtype=np.int64)
+        self.durations = np.array(durations, dtype=np.int64)
+        self._audios = audios
+        for array in (self.starts, self.durations, self._audios):
+            array.flags.writeable = False
+
+    def bounds(self):
+        """
+        Get the start and end of each time slice, in nanoseconds.
+
+        Returns
+        -------
+        (starts, ends)
+            int64 arrays of the start and end of each slice
+        """
+        return self.starts, self.starts + self.durations
+
+    def sample_plan(self):
+        """
+        Find the samples of every slice at once, each moved out to the zero crossings
+        around it, as `TimeSlice.get_samples` does for one slice.
+        Samples are not copied:  the plan gives where they are.
+
+        Returns
+        -------
+        (starting_samples, sample_starts, sample_ends)
+            as for `zero_crossing_plan`, with each slice's samples in its own audio
+        """
+        starting_samples = np.zeros(len(self), dtype=np.int64)
+        sample_starts = np.zeros((len(self), 2), dtype=np.int64)
+        sample_ends = np.zeros((len(self), 2), dtype=np.int64)
+
+        # Slices usually all share one Audio, so plan each Audio's slices together.
+        audios = {}
+        for i, audio in enumerate(self._audios):
+            audios.setdefault(id(audio), (audio, []))[1].append(i)
+        for audio, indexes in audios.values():
+            indexes = np.array(indexes)
+            plan = zero_crossing_plan(
+                audio, self.starts[indexes], self.durations[indexes]
+            )
+            starting_samples[indexes], sample_starts[indexes], sample_ends[indexes] = (
+                plan
+            )
+
+        return starting_samples, sample_starts, sample_ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, list):
+            index = np.asarray(index, dtype=None if index else np.intp)
+        if isinstance(index, (slice, np.ndarray)):
+            return TimingList._from_arrays(
+                self.name,
+                self.starts[index],
+                self.durations[index],
+                self._audios[index],
+            )
+        if not isinstance(index, numbers.Integral):
+            raise TypeError(
+                'TimingList indices must be integers, slices, lists or arrays, not {0}'.format(
+                    type(index).__name__
+                )
+            )
+        return TimeSlice._from_nanoseconds(
+            self.starts[index], self.durations[index], self._audios[index]
+        )
+
+    def __iter__(self):
+        for time, duration, audio in zip(
+            self.starts.tolist(), self.durations.tolist(), self._audios
+        ):
+            yield TimeSlice._from_nanoseconds(time, duration, audio)
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            index = range(len(self))[index]
+            index = slice(index, index + 1)
+            value = [value]
+
+        starts, durations, audios = _slice_arrays(value)
+        if index.step not in (None, 1):
+            arrays = [self.starts.copy(), self.durations.copy(), self._audios.copy()]
+            for array, new in zip(arrays, (starts, durations, audios)):
+                array[index] = new
+            self._set_arrays(*arrays)
+            return
+
+        first, last, _ = index.indices(len(self))
+        last = max(first, last)
+        self._set_arrays(
+            *[
+                np.concatenate([array[:first], new, array[last:]])
+                for array, new in zip(
+                    (self.starts, self.durations, self._audios),
+                    (starts, durations, audios),
+                )
+            ]
+        )
+
+    def __delitem__(self, index):
+        if not isinstance(index, slice):
+            index = range(len(self))[index]
+        self._set_arrays(
+            *[
+                np.delete(array, index)
+                for array in (self.starts, self.durations, self._audios)
+            ]
+        )
+
+    def insert(self, index, value):
+        if index < 0:
+            index = max(index + len(self), 0)
+        index = min(index, len(self))
+        self[index:index] = [value]
+
+    def append(self, value):
+        self[len(self) :] = [value]
+
+    def extend(self, values):
+        self[len(self) :] = values
+
+    def clear(self):
+        del self[:]
+
+    def reverse(self):
+        self._set_arrays(self.starts[::-1], self.durations[::-1], self._audios[::-1])
+
+    def sort(self, key=None, reverse=False):
+        self[:] = sorted(self, key=key, reverse=reverse)
+
+    def copy(self):
+        return self[:]
+
+    def __eq__(self, other):
+        if not isinstance(other, (TimingList, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __add__(self, other):
+        result = self.copy()
+        result.extend(other)
+        return result
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __mul__(self, count):
+        return TimingList._from_arrays(
+            self.name,
+            np.tile(self.starts, count),
+            np.tile(self.durations, count),
+            np.tile(self._audios, count),
+        )
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _to_nanoseconds(times, unit):
+    """
+    Converts times to int64 nanoseconds, as TimeSlice does.
+    """
+    if not len(times):
+        return np.zeros(0, dtype=np.int64)
+    numbers = np.asarray(times)
+    if numbers.dtype.kind in 'iuf':
+        # Converting an array is much faster than a list, with the same result.
+        times = numbers
+    return pd.to_timedelta(times, unit=unit).asi8
+
+
+def _slice_arrays(time_slices):
+    """
+    Gets the starts, durations and audio of some TimeSlices, as arrays.
+    """
+    if isinstance(time_slices, TimingList):
+        return time_slices.starts, time_slices.durations, time_slices._audios
+
+    time_slices = list(time_slices)
+    audios = np.empty(len(time_slices), dtype=object)
+    for i, time_slice in enumerate(time_slices):
+        audios[i] = time_slice.audio
+    starts = np.array([time_slice._time for time_slice in time_slices], dtype=np.int64)
+    durations = np.array(
+        [time_slice._duration for time_slice in time_slices], dtype=np.int64
+    )
+    return starts, durations, audios
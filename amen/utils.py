@@ -15,3 +15,74 @@ def example_mono_audio_file():
     """Get the included example file"""
     path = 'example_audio/amen-mono.wav'
     return pkg_resources.resource_filename(__name__, path)
+
+
+class _Pending(object):
+    """
+    Placeholder for a LazyDict value that has not been computed yet.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __repr__(self):
+        return '<pending>'
+
+
+class LazyDict(dict):
+    """
+    A dictionary whose values can be computed on first access.
+
+    Values registered with `set_lazy` are stored as pending loaders,
+    evaluated the first time the key is read, and kept afterwards.
+    Keys, membership and length include pending values.
+    """
+
+    def set_lazy(self, key, loader):
+        """
+        Register a loader for `key`.
+
+        Parameters
+        ----------
+        key : hashable
+            The key to set.
+
+        loader : callable
+            Called with no arguments the first time `key` is read.
+            Its return value is stored under `key`.
+        """
+        dict.__setitem__(self, key, _Pending(loader))
+
+    def is_loaded(self, key):
+        """
+        Check whether the value for `key` has already been computed.
+        """
+        return not isinstance(dict.__getitem__(self, key), _Pending)
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, _Pending):
+            value = value.loader()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        value = dict.pop(self, key, *default)
+        if isinstance(value, _Pending):
+            value = value.loader()
+        return value
+
+    def values(self):
+        return [self[key] for key in list(dict.keys(self))]
+
+    def items(self):
+        return [(key, self[key]) for key in list(dict.keys(self))]
+
+    def __reduce__(self):
+        # Pickle pending loaders as they are, rather than evaluating them.
+        return (self.__class__, (), self.__dict__ or None, None, iter(dict.items(self)))
@@ -31,5 +31,6 @@ setup(
         'pandas >= 0.16.0',
         'pysoundfile >= 0.8',
         'six >= 1.10.0',
+        'futures >= 3.0; python_version < "3"',
     ],
 )
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    # async syntax, and asyncio.run
+    collect_ignore.append('test_audio_async.py')
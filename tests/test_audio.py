@@ -2,11 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
+import pickle
+import shutil
 import tempfile
 import numpy as np
 import librosa
-from amen.audio import Audio
+import pytest
+import amen.audio
+from amen.audio import Audio, analyze_many, _analyze, BrokenProcessPool
 from amen.feature import FeatureCollection
+from amen.timing import TimeSlice
 from amen.utils import example_audio_file
 
 EXAMPLE_FILE = example_audio_file()
@@ -57,6 +63,13 @@ def test_zero_indexes():
     assert mono_audio.zero_indexes[0].all() == zero_index.all()
 
 
+def test_zero_indexes_are_lazy_and_compact():
+    lazy_audio = Audio(EXAMPLE_FILE)
+    assert lazy_audio._zero_indexes is None
+    assert lazy_audio.zero_indexes[0].dtype == np.int32
+    assert np.array_equal(lazy_audio.zero_indexes[1], audio.zero_indexes[1])
+
+
 def test_output():
     n, tempfilename = tempfile.mkstemp()
     audio.output(tempfilename, format='WAV')
@@ -65,3 +78,182 @@ def test_output():
 
     assert np.allclose(audio.sample_rate, new_sample_rate)
     assert np.allclose(audio.raw_samples, new_samples, rtol=1e-3, atol=1e-4)
+
+
+def test_analysis_cache():
+    directory = tempfile.mkdtemp()
+    first = Audio(EXAMPLE_FILE, cache=directory)
+    second = Audio(EXAMPLE_FILE, cache=directory)
+    assert len(os.listdir(directory)) == 1
+    shutil.rmtree(directory)
+
+    assert second._analysis.is_loaded('chroma')
+    assert np.array_equal(first._analysis['chroma'], second._analysis['chroma'])
+    assert len(second.timings['beats']) == len(first.timings['beats'])
+    for first_index, second_index in zip(first.zero_indexes, second.zero_indexes):
+        assert np.array_equal(first_index, second_index)
+
+
+def test_pickle_keeps_lazy_features():
+    lazy_audio = Audio(EXAMPLE_FILE)
+    unpickled = pickle.loads(pickle.dumps(lazy_audio))
+    assert not unpickled.features.is_loaded('chroma')
+    assert np.array_equal(unpickled.raw_samples, lazy_audio.raw_samples)
+    assert len(unpickled.timings['beats']) == len(lazy_audio.timings['beats'])
+
+
+def test_analyze_many():
+    file_paths = [EXAMPLE_FILE, 'not-a-file.wav', EXAMPLE_FILE]
+    results = list(analyze_many(file_paths, workers=2))
+    assert [file_path for file_path, _ in results] == file_paths
+
+    assert isinstance(results[0][1], Audio)
+    assert results[0][1]._analysis.is_loaded('chroma')
+    assert isinstance(results[1][1], Exception)
+    assert isinstance(results[2][1], Audio)
+
+
+def test_analyze_many_unordered():
+    file_paths = [EXAMPLE_FILE, 'not-a-file.wav']
+    results = list(analyze_many(file_paths, workers=2, ordered=False, max_pending=1))
+    assert sorted(file_path for file_path, _ in results) == sorted(file_paths)
+
+
+def crash_on_missing_file(file_path, kwargs):
+    if not os.path.exists(file_path):
+        # As if the decoder had crashed the worker process.
+        os._exit(1)
+    return _analyze(file_path, kwargs)
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3,), reason='the futures backport cannot detect crashed workers'
+)
+def test_analyze_many_survives_crashed_worker(monkeypatch):
+    monkeypatch.setattr(amen.audio, '_analyze', crash_on_missing_file)
+    file_paths = ['not-a-file.wav', EXAMPLE_FILE]
+    results = list(analyze_many(file_paths, workers=1, max_pending=1))
+    assert [file_path for file_path, _ in results] == file_paths
+    assert isinstance(results[0][1], BrokenProcessPool)
+    assert isinstance(results[1][1], Audio)
+
+
+def test_pickle_drops_analysis_samples():
+    resampled_audio = Audio(EXAMPLE_FILE)
+    resampled_audio.analysis_samples
+    unpickled = pickle.loads(pickle.dumps(resampled_audio))
+    assert unpickled._analysis_samples is None
+    assert np.array_equal(unpickled.analysis_samples, resampled_audio.analysis_samples)
+
+
+def test_memory_mapped_samples():
+    directory = tempfile.mkdtemp()
+    mapped_audio = Audio(EXAMPLE_FILE, mmap_dir=directory)
+    mapped_mono_audio = Audio(EXAMPLE_FILE, convert_to_mono=True, mmap_dir=directory)
+    Audio(EXAMPLE_FILE, mmap_dir=directory)
+    unpickled = pickle.loads(pickle.dumps(mapped_audio))
+    assert len(os.listdir(directory)) == 2
+
+    assert isinstance(mapped_audio.raw_samples, np.memmap)
+    assert mapped_audio.num_channels == 2
+    assert np.allclose(mapped_audio.raw_samples, audio.raw_samples)
+    assert mapped_mono_audio.num_channels == 1
+    assert np.allclose(mapped_mono_audio.raw_samples, mono_audio.raw_samples)
+    assert isinstance(unpickled.raw_samples, np.memmap)
+    shutil.rmtree(directory)
+
+
+def test_memory_mapped_samples_at_native_rate():
+    directory = tempfile.mkdtemp()
+    mapped_audio = Audio(EXAMPLE_FILE, sample_rate=None, mmap_dir=directory)
+    assert mapped_audio.sample_rate == 44100
+    assert np.allclose(mapped_audio.raw_samples, audio.raw_samples)
+
+    # Reloading after unpickling reuses the same decoded file.
+    unpickled = pickle.loads(pickle.dumps(mapped_audio))
+    unpickled.raw_samples
+    assert len(os.listdir(directory)) == 1
+    shutil.rmtree(directory)
+
+
+def test_memory_mapped_samples_are_not_copied():
+    directory = tempfile.mkdtemp()
+    mapped_audio = Audio(EXAMPLE_FILE, mmap_dir=directory, dtype=np.float64)
+    assert isinstance(mapped_audio.raw_samples, np.memmap)
+    assert mapped_audio.raw_samples.dtype == np.float32
+    assert mapped_audio.analysis_samples.dtype == np.float64
+    shutil.rmtree(directory)
+
+
+def test_polyphase_resampling():
+    polyphase_audio = Audio(EXAMPLE_FILE, res_type='polyphase')
+    y = librosa.resample(
+        librosa.to_mono(audio.raw_samples),
+        orig_sr=44100,
+        target_sr=22050,
+        res_type='polyphase',
+    )
+    assert np.allclose(polyphase_audio.analysis_samples, y, atol=1e-6)
+
+
+def test_resampling_skipped_at_analysis_rate():
+    same_rate_audio = Audio(
+        EXAMPLE_FILE, convert_to_mono=True, analysis_sample_rate=44100
+    )
+    assert np.array_equal(same_rate_audio.analysis_samples, mono_audio.raw_samples[0])
+
+
+def test_windowed_loading():
+    window_audio = Audio(EXAMPLE_FILE, offset=1.0, duration=2.0)
+    assert window_audio.offset == 1.0
+    assert np.isclose(window_audio.duration, 2.0)
+    assert np.array_equal(
+        window_audio.raw_samples, audio.raw_samples[:, 44100 : 3 * 44100]
+    )
+
+    track = window_audio.timings['track'][0]
+    assert track.time.total_seconds() == 1.0
+    assert np.isclose(track.duration.total_seconds(), 2.0)
+
+    index = window_audio.features['amplitude'].data.index.total_seconds()
+    assert index[0] == 1.0
+    assert index[-1] <= 3.0
+    for beat in window_audio.timings['beats']:
+        assert 1.0 <= beat.time.total_seconds() <= 3.0
+
+
+def test_windowed_loading_keeps_time_base():
+    window_audio = Audio(EXAMPLE_FILE, offset=1.0, duration=2.0)
+    window_slice = TimeSlice(1.5, 0.5, window_audio)
+    full_slice = TimeSlice(1.5, 0.5, audio)
+    window_samples, _, _ = window_slice.get_samples()
+    full_samples, _, _ = full_slice.get_samples()
+    assert np.array_equal(window_samples, full_samples)
+
+
+def test_windowed_streaming():
+    window_audio = Audio(EXAMPLE_FILE, stream=True, offset=1.0, duration=2.0)
+    assert np.isclose(window_audio.duration, 2.0)
+    amplitude = window_audio.features['amplitude'].data
+    assert window_audio._raw_samples is None
+    assert amplitude.index.total_seconds()[0] == 1.0
+    assert (
+        abs(
+            len(amplitude)
+            - len(Audio(EXAMPLE_FILE, offset=1.0, duration=2.0).features['amplitude'])
+        )
+        <= 1
+    )
+    assert np.array_equal(
+        window_audio.raw_samples, audio.raw_samples[:, 44100 : 3 * 44100]
+    )
+
+
+def test_windowed_memory_map():
+    directory = tempfile.mkdtemp()
+    window_audio = Audio(EXAMPLE_FILE, mmap_dir=directory, offset=1.0, duration=2.0)
+    assert isinstance(window_audio.raw_samples, np.memmap)
+    assert np.allclose(
+        window_audio.raw_samples, audio.raw_samples[:, 44100 : 3 * 44100]
+    )
+    shutil.rmtree(directory)
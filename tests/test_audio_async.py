@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import multiprocessing
+import pytest
+import amen.audio
+from amen.audio import Audio
+from amen.utils import example_audio_file
+
+EXAMPLE_FILE = example_audio_file()
+
+
+def test_load_async():
+    async def load_two():
+        return await asyncio.gather(
+            Audio.load_async(EXAMPLE_FILE),
+            Audio.load_async(EXAMPLE_FILE, convert_to_mono=True),
+        )
+
+    stereo, mono = asyncio.run(load_two())
+    assert stereo.num_channels == 2
+    assert mono.num_channels == 1
+    assert stereo._analysis.is_loaded('chroma')
+    assert amen.audio._load_executor()._max_workers == multiprocessing.cpu_count()
+
+
+def test_load_async_timeout():
+    async def load():
+        return await Audio.load_async(EXAMPLE_FILE, timeout=1e-6)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(load())
+
+
+def test_load_async_cancel():
+    async def load_and_cancel():
+        task = asyncio.ensure_future(Audio.load_async(EXAMPLE_FILE))
+        await asyncio.sleep(0)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(load_and_cancel())
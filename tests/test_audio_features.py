@@ -5,8 +5,11 @@ import os
 import tempfile
 import numpy as np
 import librosa
-from amen.audio import Audio
-from amen.feature import FeatureCollection
+import pytest
+from amen.audio import Audio, FEATURE_NAMES
+from amen.exceptions import AudioError
+from amen.extractors import EXTRACTORS, register_extractor
+from amen.feature import FeatureCollection, MatrixFeatureCollection
 from amen.utils import example_audio_file
 
 EXAMPLE_FILE = example_audio_file()
@@ -45,6 +48,26 @@ def test_has_chroma_feature_aliases():
     assert mono_audio.features["chroma"]["db"].data.iloc[0].item() == res[0]
 
 
+def test_chroma_shares_one_matrix():
+    chroma = mono_audio.features["chroma"]
+    assert isinstance(chroma, MatrixFeatureCollection)
+    assert list(chroma.feature.data.columns)[:2] == ['c', 'c#']
+    assert np.shares_memory(chroma['c'].data.values, chroma.feature.data.values)
+
+
+def test_timbre_columns_keep_their_name():
+    timbre = mono_audio.features["timbre"]
+    mfcc = timbre["mfcc_3"]
+    assert mfcc.name == 'timbre'
+    assert np.array_equal(
+        mfcc.data['timbre'].values, timbre.feature.data['mfcc_3'].values
+    )
+    assert np.shares_memory(mfcc.data.values, timbre.feature.data.values)
+    beats = mono_audio.timings['beats']
+    assert timbre.at(beats)["mfcc_3"].name == 'timbre'
+    assert list(timbre.at(beats).feature.data.columns)[:2] == ['mfcc_0', 'mfcc_1']
+
+
 def test_has_tempo_feature():
     onset_env = librosa.onset.onset_strength(
         mono_audio.analysis_samples, sr=mono_audio.analysis_sample_rate
@@ -53,3 +76,113 @@ def test_has_tempo_feature():
         onset_envelope=onset_env, sr=mono_audio.analysis_sample_rate, aggregate=None
     )
     assert mono_audio.features["tempo"].data.iloc[0].item() == res[0]
+
+
+def test_features_are_lazy():
+    lazy_audio = Audio(EXAMPLE_FILE)
+    assert 'chroma' in lazy_audio.features
+    assert not lazy_audio.features.is_loaded('chroma')
+    lazy_audio.features['amplitude']
+    assert lazy_audio.features.is_loaded('amplitude')
+    assert not lazy_audio.features.is_loaded('chroma')
+
+
+def test_features_share_intermediates():
+    shared_audio = Audio(
+        EXAMPLE_FILE, feature_names=['timbre', 'tempo'], timing_names=['track']
+    )
+    shared_audio.features['timbre']
+    # Only what tempo still needs is kept.
+    assert set(shared_audio._intermediates) == {'log_mel'}
+
+    log_mel = shared_audio._intermediates['log_mel']
+    shared_audio.features['tempo']
+    assert shared_audio._intermediates == {}
+    onset_envelope = librosa.onset.onset_strength(
+        S=log_mel, sr=shared_audio.analysis_sample_rate
+    )
+    tempo = librosa.beat.tempo(
+        onset_envelope=onset_envelope,
+        sr=shared_audio.analysis_sample_rate,
+        aggregate=None,
+    )
+    assert np.allclose(shared_audio.features['tempo'].data['tempo'], tempo)
+
+
+def test_custom_extractor_feature():
+    @register_extractor('spectral_peak', requires=('stft',), feature=True)
+    def spectral_peak(audio, S):
+        return S.argmax(axis=0)
+
+    try:
+        custom_audio = Audio(EXAMPLE_FILE, feature_names=['spectral_peak', 'centroid'])
+        peaks = custom_audio.features['spectral_peak'].data['spectral_peak']
+        S = np.abs(librosa.stft(custom_audio.analysis_samples))
+        assert np.array_equal(peaks, S.argmax(axis=0))
+    finally:
+        del EXTRACTORS['spectral_peak']
+
+
+def test_default_features_free_intermediates():
+    default_audio = Audio(EXAMPLE_FILE)
+    assert default_audio.feature_names == FEATURE_NAMES
+    default_audio._extract_all()
+    assert default_audio._intermediates == {}
+
+
+def test_intermediates_are_not_features():
+    with pytest.raises(AudioError):
+        Audio(EXAMPLE_FILE, feature_names=['stft'])
+
+
+def test_float32_features():
+    float32_audio = Audio(EXAMPLE_FILE, dtype=np.float32)
+    assert float32_audio.raw_samples.dtype == np.float32
+    assert float32_audio.analysis_samples.dtype == np.float32
+
+    centroid = float32_audio.features['centroid']
+    assert centroid.data.dtypes.iloc[0] == np.float32
+    assert float32_audio.features['tempo'].data.dtypes.iloc[0] == np.float32
+    assert float32_audio.features['chroma']['c'].data.dtypes.iloc[0] == np.float32
+
+    beats = float32_audio.timings['beats']
+    assert centroid.at(beats).data.dtypes.iloc[0] == np.float32
+    assert np.allclose(
+        centroid.at(beats).data.values,
+        audio.features['centroid'].at(audio.timings['beats']).data.values,
+        rtol=1e-4,
+    )
+
+
+def test_has_onset_strength_feature():
+    res = librosa.onset.onset_strength(
+        y=mono_audio.analysis_samples, sr=mono_audio.analysis_sample_rate
+    )
+    assert np.array_equal(mono_audio.features["onset_strength"].data.values[:, 0], res)
+
+
+def test_selected_features():
+    selected_audio = Audio(
+        EXAMPLE_FILE, feature_names=['amplitude'], timing_names=['beats']
+    )
+    assert selected_audio.feature_names == ('amplitude',)
+    assert list(selected_audio.features.keys()) == ['amplitude']
+    assert list(selected_audio.timings.keys()) == ['beats']
+    assert sorted(selected_audio._analysis.keys()) == ['amplitude', 'beats']
+
+
+def test_unknown_feature():
+    with pytest.raises(AudioError):
+        Audio(EXAMPLE_FILE, feature_names=['loudness'])
+
+
+def test_threaded_analysis():
+    threaded_audio = Audio(EXAMPLE_FILE, threads=4)
+    for name in threaded_audio._analysis:
+        assert threaded_audio._analysis.is_loaded(name)
+    assert threaded_audio._intermediates == {}
+    for name in ('centroid', 'amplitude', 'tempo', 'onset_strength'):
+        assert np.allclose(
+            threaded_audio.features[name].data, audio.features[name].data
+        )
+    assert len(threaded_audio.timings['beats']) == len(audio.timings['beats'])
@@ -25,3 +25,11 @@ def test_segments():
     segments = AUDIO.timings['segments']
     assert isinstance(segments, TimingList)
     assert len(segments) == 42
+
+
+def test_timings_are_lazy():
+    lazy_audio = Audio(EXAMPLE_FILE)
+    assert 'segments' in lazy_audio.timings
+    assert not lazy_audio.timings.is_loaded('segments')
+    lazy_audio.timings['beats']
+    assert not lazy_audio.timings.is_loaded('segments')
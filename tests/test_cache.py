@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import librosa
+from amen.cache import AnalysisCache, load_memmap, _memmap_key, _replace
+from amen.utils import example_audio_file
+
+EXAMPLE_FILE = example_audio_file()
+
+samples = np.linspace(-1, 1, 1000)
+
+
+def test_key_is_stable():
+    assert AnalysisCache.key(samples, sample_rate=1) == AnalysisCache.key(
+        samples.copy(), sample_rate=1
+    )
+
+
+def test_key_depends_on_params():
+    assert AnalysisCache.key(samples, sample_rate=1) != AnalysisCache.key(
+        samples, sample_rate=2
+    )
+
+
+def test_key_depends_on_samples():
+    assert AnalysisCache.key(samples) != AnalysisCache.key(samples * 0.5)
+
+
+def test_save_and_load():
+    directory = tempfile.mkdtemp()
+    cache = AnalysisCache(directory)
+    key = cache.key(samples)
+    assert cache.load(key) is None
+
+    cache.save(key, {'samples': samples})
+    arrays = cache.load(key)
+    shutil.rmtree(directory)
+    assert np.array_equal(arrays['samples'], samples)
+
+
+def test_eviction():
+    directory = tempfile.mkdtemp()
+    cache = AnalysisCache(directory)
+    keys = [cache.key(samples, index=index) for index in range(3)]
+    cache.save(keys[0], {'samples': samples})
+    cache.max_size = int(os.path.getsize(cache._path(keys[0])) * 2.5)
+    for index, key in enumerate(keys):
+        cache.save(key, {'samples': samples})
+        os.utime(cache._path(key), (index, index))
+    cache.save(keys[-1], {'samples': samples})
+
+    loaded = [cache.load(key) is not None for key in keys]
+    shutil.rmtree(directory)
+    assert loaded == [False, True, True]
+
+
+def test_load_memmap_resampled():
+    directory = tempfile.mkdtemp()
+    samples = load_memmap(EXAMPLE_FILE, directory, sample_rate=22050, mono=True)
+    y, _ = librosa.load(EXAMPLE_FILE, sr=22050, mono=True)
+    shutil.rmtree(directory)
+    assert samples.shape == (1, len(y))
+    assert np.allclose(samples[0], y)
+
+
+def test_memmap_key():
+    key = _memmap_key(EXAMPLE_FILE, 44100, False)
+    assert key == _memmap_key(EXAMPLE_FILE, 44100, False)
+    assert key != _memmap_key(EXAMPLE_FILE, 22050, False)
+    assert key != _memmap_key(EXAMPLE_FILE, 44100, True)
+    assert key != AnalysisCache.key((), sample_rate=44100, mono=False)
+
+
+def test_replace_overwrites():
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, 'source')
+    destination = os.path.join(directory, 'destination')
+    for path, text in ((source, 'new'), (destination, 'old')):
+        with open(path, 'w') as f:
+            f.write(text)
+    _replace(source, destination)
+    with open(destination) as f:
+        text = f.read()
+    moved = not os.path.exists(source)
+    shutil.rmtree(directory)
+    assert moved
+    assert text == 'new'
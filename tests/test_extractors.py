@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from amen.exceptions import ExtractorError
+from amen.extractors import Extractor, dependencies, extract
+
+calls = []
+
+
+def make_extractor(name, requires=()):
+    def function(audio, *inputs):
+        calls.append(name)
+        return name + '(' + ','.join(inputs) + ')'
+
+    return Extractor(name, function, requires)
+
+
+# a diamond: d needs b and c, which both need a
+EXAMPLE_EXTRACTORS = {
+    'a': make_extractor('a'),
+    'b': make_extractor('b', requires=('a',)),
+    'c': make_extractor('c', requires=('a',)),
+    'd': make_extractor('d', requires=('b', 'c')),
+}
+
+
+def test_dependencies():
+    assert dependencies(['d'], EXAMPLE_EXTRACTORS) == {'a', 'b', 'c', 'd'}
+    assert dependencies(['d'], EXAMPLE_EXTRACTORS, available=['b']) == {
+        'b',
+        'c',
+        'a',
+        'd',
+    }
+    assert dependencies(['b'], EXAMPLE_EXTRACTORS, available=['b']) == {'b'}
+
+
+def test_extract_computes_once():
+    del calls[:]
+    intermediates = {}
+    results = extract(None, ['d'], EXAMPLE_EXTRACTORS, intermediates=intermediates)
+    assert results == {'d': 'd(b(a()),c(a()))'}
+    assert sorted(calls) == ['a', 'b', 'c', 'd']
+    assert intermediates == {}
+
+
+def test_extract_keeps_needed_intermediates():
+    del calls[:]
+    intermediates = {}
+    results = extract(
+        None, ['b'], EXAMPLE_EXTRACTORS, intermediates=intermediates, keep=['c']
+    )
+    assert results == {'b': 'b(a())'}
+    assert intermediates == {'a': 'a()'}
+
+    results = extract(None, ['c'], EXAMPLE_EXTRACTORS, intermediates=intermediates)
+    assert results == {'c': 'c(a())'}
+    assert sorted(calls) == ['a', 'b', 'c']
+    assert intermediates == {}
+
+
+def test_extract_with_executor():
+    del calls[:]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = extract(None, ['b', 'd'], EXAMPLE_EXTRACTORS, executor=executor)
+    assert results == {'b': 'b(a())', 'd': 'd(b(a()),c(a()))'}
+    assert sorted(calls) == ['a', 'b', 'c', 'd']
+
+
+def test_extract_unknown_name():
+    with pytest.raises(ExtractorError):
+        extract(None, ['e'], EXAMPLE_EXTRACTORS)
+
+
+def test_extract_circular():
+    extractors = {
+        'x': make_extractor('x', requires=('y',)),
+        'y': make_extractor('y', requires=('x',)),
+    }
+    with pytest.raises(ExtractorError):
+        extract(None, ['x'], extractors)
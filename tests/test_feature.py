@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import pickle
+
 import librosa
 import numpy as np
 import pandas as pd
@@ -8,9 +10,16 @@ import pytest
 
 from pandas.util.testing import assert_frame_equal
 
+import amen.feature
 from amen.audio import Audio
 from amen.feature import Feature
 from amen.feature import FeatureCollection
+from amen.feature import MatrixFeatureCollection
+from amen.feature import AT_CACHE_SIZE
+from amen.feature import FrameIndex
+from amen.feature import AGGREGATES
+from amen.feature import PrefixSums
+from amen.feature import _padded
 from amen.timing import TimeSlice
 from amen.utils import example_audio_file
 from amen.exceptions import FeatureError
@@ -122,6 +131,230 @@ def test_with_single_slice():
     assert len(feature_at.data) == 1
 
 
+def at_by_mask(feature, time_slices):
+    # Resampling one slice at a time, with a boolean mask over the index.
+    rows = []
+    for time_slice in time_slices:
+        slice_index = (time_slice.time <= feature.data.index) & (
+            feature.data.index < time_slice.time + time_slice.duration
+        )
+        rows.append(feature.aggregate(feature.data[slice_index], axis=0))
+    return np.array(rows, dtype=float)
+
+
+random_slices = [
+    TimeSlice(start, duration, audio)
+    for start, duration in zip(
+        np.random.RandomState(0).uniform(-1, 11, 200),
+        np.random.RandomState(1).uniform(0, 2, 200),
+    )
+]
+# empty, and past the end of the data
+random_slices += [TimeSlice(2, 0, audio), TimeSlice(20, 1, audio)]
+
+
+@pytest.mark.parametrize('aggregate', list(AGGREGATES.values()))
+def test_at_matches_masks(aggregate):
+    feature = Feature(test_dataframe, aggregate=aggregate)
+    resampled = feature.at(random_slices)
+    assert len(resampled.data) == len(random_slices)
+    assert np.allclose(
+        resampled.data.values, at_by_mask(feature, random_slices), equal_nan=True
+    )
+
+
+def test_at_with_several_aggregates():
+    aggregates = ['mean', 'max', 'std', 'first', np.min]
+    resampled = test_feature.at(random_slices, aggregates=aggregates)
+    assert list(resampled.keys()) == ['mean', 'max', 'std', 'first', 'min']
+    for aggregate, feature in zip(aggregates, resampled.values()):
+        single = Feature(test_dataframe, aggregate=AGGREGATES.get(aggregate, aggregate))
+        assert feature.aggregate == single.aggregate
+        assert np.allclose(
+            feature.data.values,
+            single.at(random_slices).data.values,
+            equal_nan=True,
+        )
+    # resampling again keeps each aggregate
+    again = resampled['max'].at(time_slices)
+    assert np.allclose(
+        again.data.values,
+        at_by_mask(Feature(test_dataframe, aggregate=np.max), time_slices),
+    )
+
+
+def test_at_with_unknown_aggregate():
+    with pytest.raises(FeatureError):
+        test_feature.at(time_slices, aggregates=['mode'])
+
+
+def test_at_with_duplicate_aggregate_names():
+    with pytest.raises(FeatureError):
+        test_feature.at(time_slices, aggregates=['mean', np.mean])
+
+
+def test_at_pads_the_data_once(monkeypatch):
+    padded = []
+
+    def counted(values):
+        padded.append(values)
+        return _padded(values)
+
+    monkeypatch.setattr(amen.feature, '_padded', counted)
+    Feature(test_dataframe).at(random_slices, aggregates=['sum', 'max', 'var', 'last'])
+    assert len(padded) == 1
+
+
+def test_collection_at_with_several_aggregates():
+    features = audio.features.get(['amplitude', 'chroma'])
+    resampled = features.at(time_slices, aggregates=['mean', 'max'])
+    assert np.array_equal(
+        resampled['amplitude']['max'].data.values,
+        Feature(features['amplitude'].data, aggregate=np.max)
+        .at(time_slices)
+        .data.values,
+    )
+    assert isinstance(resampled['chroma']['max'], MatrixFeatureCollection)
+    assert np.array_equal(
+        resampled['chroma']['mean']['db'].data.values,
+        features['chroma'].at(time_slices)['c#'].data.values,
+    )
+
+
+@pytest.mark.parametrize('aggregate', ['mean', 'sum', 'var', 'std'])
+def test_windows_match_at(aggregate):
+    resampled = Feature(test_dataframe, aggregate=AGGREGATES[aggregate])
+    assert np.allclose(
+        test_feature.windows(random_slices, aggregate=aggregate),
+        resampled.at(random_slices).data.values,
+        rtol=1e-4,
+        atol=1e-7,
+        equal_nan=True,
+    )
+
+
+def test_windows_from_arrays():
+    starts = np.array([time_slice.time.total_seconds() for time_slice in random_slices])
+    durations = np.array(
+        [time_slice.duration.total_seconds() for time_slice in random_slices]
+    )
+    assert np.array_equal(
+        test_feature.windows(starts, durations),
+        test_feature.windows(random_slices),
+        equal_nan=True,
+    )
+    assert np.array_equal(
+        test_feature.windows(starts * 1000, durations * 1000, unit='ms'),
+        test_feature.windows(random_slices),
+        equal_nan=True,
+    )
+
+
+def test_windows_skip_missing_values():
+    values = np.array([[1.0, np.nan], [3.0, 2.0], [np.nan, 4.0]])
+    prefix_sums = PrefixSums(values)
+    lo, hi = np.array([0, 0, 1]), np.array([3, 1, 1])
+    assert np.array_equal(
+        prefix_sums.mean(lo, hi),
+        [[2.0, 3.0], [1.0, np.nan], [np.nan, np.nan]],
+        equal_nan=True,
+    )
+    assert np.array_equal(prefix_sums.sum(lo, hi), [[4.0, 6.0], [1.0, 0.0], [0, 0]])
+    assert np.allclose(prefix_sums.var(lo, hi)[0], [1.0, 1.0])
+
+
+def test_windows_with_unknown_aggregate():
+    with pytest.raises(FeatureError):
+        test_feature.windows(time_slices, aggregate='median')
+
+
+def test_at_with_unsorted_index():
+    shuffled = test_dataframe.sample(frac=1, random_state=0)
+    feature = Feature(shuffled)
+    assert np.allclose(
+        feature.at(random_slices).data.values,
+        at_by_mask(test_feature, random_slices),
+        equal_nan=True,
+    )
+
+
+def test_frame_index_times():
+    frame_index = FrameIndex(100, 22050, 512, offset=1.5)
+    times = librosa.frames_to_time(np.arange(100), sr=22050, hop_length=512) + 1.5
+    assert len(frame_index) == 100
+    assert np.array_equal(frame_index.to_timedelta(), pd.to_timedelta(times, unit='s'))
+
+
+def test_frame_index_matches_search():
+    frame_index = audio.features['amplitude'].frame_index
+    index = audio.features['amplitude'].data.index.asi8
+    assert np.array_equal(frame_index.times(), index)
+    times = np.concatenate(
+        [
+            index,
+            index + 1,
+            index - 1,
+            np.random.RandomState(2).randint(-(10**9), index[-1] + 10**9, 1000),
+        ]
+    )
+    assert np.array_equal(
+        frame_index.frames_at(times), np.searchsorted(index, times, side='left')
+    )
+
+
+def test_at_on_frame_index():
+    amplitude = audio.features['amplitude']
+    searched = Feature(amplitude.data)
+    assert searched.frame_index is None
+    for time_slices in (audio.timings['beats'], audio.timings['segments']):
+        assert np.array_equal(
+            amplitude.at(time_slices).data.values,
+            searched.at(time_slices).data.values,
+        )
+
+
+def test_at_is_remembered():
+    feature = Feature(test_dataframe)
+    beats = audio.timings['beats']
+    first = feature.at(beats)
+    second = feature.at(beats)
+    assert second.data is first.data
+    assert second.time_slices is beats
+    assert feature.at(list(beats)).data is first.data
+
+
+def test_at_memo_follows_timing_list_changes():
+    feature = Feature(test_dataframe)
+    beats = Audio(EXAMPLE_FILE).timings['beats']
+    forwards = feature.at(beats)
+    beats.reverse()
+    backwards = feature.at(beats)
+    assert backwards.data is not forwards.data
+    assert np.allclose(backwards.data.values, forwards.data.values[::-1])
+
+    beats.pop()
+    assert len(feature.at(beats).data) == len(beats)
+
+
+def test_at_memo_follows_aggregate_changes():
+    feature = Feature(test_dataframe)
+    beats = audio.timings['beats']
+    means = feature.at(beats).data.values
+    feature.aggregate = np.max
+    maxima = feature.at(beats).data.values
+    assert np.allclose(maxima, feature.at(beats, ['max'])['max'].data.values)
+    assert not np.allclose(maxima, means)
+
+
+def test_at_memo_is_bounded():
+    feature = Feature(test_dataframe)
+    for start in range(AT_CACHE_SIZE + 1):
+        feature.at(TimeSlice(start * 0.1, 0.1, audio))
+    assert len(feature._at_cache) == AT_CACHE_SIZE
+    first = feature.at(TimeSlice(0, 0.1, audio))
+    assert np.allclose(first.data.values, at_by_mask(feature, [first.time_slices[0]]))
+
+
 # Test with_time
 def test_with_time_raises():
     def test():
@@ -221,3 +454,89 @@ def test_feature_collection_with_time_features():
     for beat, feature in feature_collection_at.with_time():
         features.append(feature)
     assert features == looped_features
+
+
+def test_as_matrix():
+    matrix = feature_collection.as_matrix()
+    assert matrix.shape == (len(test_feature), 2)
+    assert np.array_equal(matrix[:, 0], test_feature.data[test_feature.name].values)
+
+
+def test_to_records():
+    records = feature_collection.to_records()
+    assert records.dtype.names == ('test', 'another_test')
+    assert records[3]['another_test'] == test_feature[3]
+
+
+def test_nested_collections():
+    features = audio.features.get(['amplitude', 'chroma']).at(time_slices)
+    rows = list(features)
+    assert len(rows) == len(time_slices)
+    assert rows[1]['chroma']['db'] == features['chroma']['c#'][1]
+    assert rows[1]['amplitude'] == features['amplitude'][1]
+
+    records = features.to_records()
+    assert records.dtype.names[:3] == ('amplitude', 'chroma.c', 'chroma.c#')
+    assert records[1]['chroma.db'] == rows[1]['chroma']['db']
+    assert features.as_matrix().shape == (len(time_slices), 1 + 17)
+
+
+# Test MatrixFeatureCollection
+matrix_dataframe = pd.DataFrame(
+    data=audio.analysis_samples[:3000].reshape(3, 1000).T,
+    index=test_index,
+    columns=['first', 'second', 'third'],
+)
+matrix_collection = MatrixFeatureCollection(
+    Feature(matrix_dataframe), aliases={'alias': 'second'}
+)
+
+
+def test_matrix_columns():
+    assert sorted(matrix_collection.keys()) == ['alias', 'first', 'second', 'third']
+    column = matrix_collection['second']
+    assert column.name == 'second'
+    assert np.array_equal(column.data.values[:, 0], matrix_dataframe['second'].values)
+    assert np.array_equal(matrix_collection['alias'].data, column.data)
+
+
+def test_matrix_at():
+    matrix_at = matrix_collection.at(random_slices)
+    assert isinstance(matrix_at, MatrixFeatureCollection)
+    for key in matrix_collection.keys():
+        column_at = Feature(matrix_collection[key].data).at(random_slices)
+        assert np.allclose(
+            matrix_at[key].data.values, column_at.data.values, equal_nan=True
+        )
+    # resampling a resampled column starts again from the original data
+    again = matrix_at['third'].at(time_slices)
+    assert np.allclose(
+        again.data.values, matrix_collection['third'].at(time_slices).data.values
+    )
+
+
+def test_matrix_iter():
+    rows = list(matrix_collection)
+    assert len(rows) == len(matrix_collection) == len(matrix_dataframe)
+    assert rows[5]['first'] == matrix_dataframe['first'].iloc[5]
+    assert rows[5]['alias'] == matrix_dataframe['second'].iloc[5]
+
+
+def test_matrix_with_time():
+    matrix_at = matrix_collection.at(time_slices)
+    slices, rows = zip(*matrix_at.with_time())
+    assert list(slices) == time_slices
+    assert list(rows) == list(matrix_at)
+
+
+def test_matrix_pickle():
+    matrix_collection['first']
+    unpickled = pickle.loads(pickle.dumps(matrix_collection))
+    assert sorted(unpickled.keys()) == sorted(matrix_collection.keys())
+    assert not unpickled.is_loaded('first')
+    assert_frame_equal(unpickled.feature.data, matrix_dataframe)
+
+
+def test_matrix_as_matrix():
+    matrix = matrix_collection.get(['first', 'alias']).as_matrix()
+    assert np.array_equal(matrix, matrix_dataframe[['first', 'second']].values)
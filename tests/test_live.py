@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import librosa
+import pytest
+from amen.audio import Audio
+from amen.exceptions import AudioError
+from amen.live import LiveAudio, _RingBuffer
+from amen.streaming import StreamAnalyzer
+from amen.utils import example_audio_file
+
+EXAMPLE_FILE = example_audio_file()
+y, sr = librosa.load(EXAMPLE_FILE, sr=22050, mono=False)
+audio = Audio(EXAMPLE_FILE, sample_rate=22050)
+
+
+def feed(live_audio, block_size=4096):
+    for start in range(0, y.shape[1], block_size):
+        live_audio.append(y[:, start : start + block_size])
+    return live_audio
+
+
+live_audio = feed(LiveAudio(sample_rate=sr, num_channels=2))
+
+
+def test_empty():
+    empty = LiveAudio()
+    assert empty.duration == 0
+    assert len(empty.features['amplitude']) == 0
+    assert len(empty.timings['beats']) == 0
+
+
+def test_samples():
+    assert np.allclose(live_audio.raw_samples, y)
+    assert np.allclose(live_audio.analysis_samples, librosa.to_mono(y))
+    assert np.isclose(live_audio.duration, audio.duration)
+
+
+def test_features_match_streaming():
+    analyzer = StreamAnalyzer(
+        sr,
+        hop_length=live_audio.hop_length,
+        n_fft=live_audio.n_fft,
+        fmax=256.0 * sr / live_audio.hop_length,
+    )
+    streamed = analyzer.process(librosa.to_mono(y))
+    centroid = live_audio.features['centroid'].data['spectral_centroid']
+    assert len(centroid) == live_audio._analyzer.frames
+    assert np.allclose(centroid, streamed['centroid'][0, : len(centroid)], rtol=1e-4)
+
+
+def test_timings():
+    beats = live_audio.timings['beats']
+    assert abs(len(beats) - len(audio.timings['beats'])) <= 2
+    segments = live_audio.timings['segments']
+    assert abs(len(segments) - len(audio.timings['segments'])) <= 3
+    samples, _, _ = beats[0].get_samples()
+    assert samples.shape[0] == 2
+
+
+def test_bounded_buffer():
+    bounded = feed(LiveAudio(sample_rate=sr, num_channels=2, buffer_duration=2.0))
+    assert bounded.duration <= 2.0 + 4096.0 / sr
+    assert bounded.offset > 0
+    start = round(bounded.offset * sr)
+    assert np.allclose(bounded.raw_samples, y[:, start:])
+
+    index = bounded.features['amplitude'].data.index.total_seconds()
+    assert np.isclose(index[0], bounded.offset)
+    for beat in bounded.timings['beats']:
+        assert beat.time.total_seconds() >= bounded.offset
+    # The beats still in the buffer are the same as with an unbounded buffer.
+    recent = [
+        b.time
+        for b in live_audio.timings['beats']
+        if b.time >= bounded.timings['beats'][0].time
+    ]
+    assert [b.time for b in bounded.timings['beats']] == recent
+
+
+def test_attributes_match_audio():
+    empty = LiveAudio()
+    for name in audio.__dict__:
+        if not name.startswith('_analysis') and name != 'features':
+            assert hasattr(empty, name), name
+
+
+def test_ring_buffer():
+    ring = _RingBuffer((2,), 5, np.float64)
+    values = np.arange(24, dtype=float).reshape(2, 12)
+    data = ring._data
+    for start, stop in ((0, 3), (3, 7), (7, 8), (8, 12)):
+        ring.append(values[:, start:stop])
+        assert np.array_equal(ring.view(), values[:, max(stop - 5, 0) : stop])
+    ring.append(values)
+    assert np.array_equal(ring.view(), values[:, -5:])
+    ring.keep(2)
+    assert np.array_equal(ring.copy(), values[:, -2:])
+    assert ring._data is data
+
+
+def test_bounded_buffer_reuses_memory():
+    bounded = LiveAudio(sample_rate=sr, num_channels=2, buffer_duration=2.0)
+    feed(bounded)
+    data = bounded._samples._data
+    frames = bounded._frames['timbre']._data
+    bounded.append(y[:, :4096])
+    assert bounded._samples._data is data
+    assert bounded._frames['timbre']._data is frames
+
+
+def test_read_features_are_snapshots():
+    growing = LiveAudio(sample_rate=sr, num_channels=2, buffer_duration=2.0)
+    feed(growing)
+    amplitude = growing.features['amplitude'].data.copy()
+    samples = growing.raw_samples.copy()
+    feature = growing.features['amplitude']
+    raw_samples = growing.raw_samples
+    growing.append(y[:, :8192])
+    assert feature.data.equals(amplitude)
+    assert np.array_equal(raw_samples, samples)
+    assert not growing.features['amplitude'].data.equals(amplitude)
+
+
+def test_dropped_time_slices_raise():
+    bounded = LiveAudio(sample_rate=sr, num_channels=2, buffer_duration=2.0)
+    beat = feed(bounded).timings['beats'][0]
+    beat.get_samples()
+    bounded.append(y[:, : 3 * sr])
+    with pytest.raises(AudioError):
+        beat.get_samples()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import librosa
+import pytest
+import soundfile as sf
+from amen.audio import Audio
+from amen.exceptions import AudioError
+from amen.streaming import StreamAnalyzer
+from amen.utils import example_audio_file
+
+EXAMPLE_FILE = example_audio_file()
+audio = Audio(EXAMPLE_FILE)
+y = audio.analysis_samples
+sr = audio.analysis_sample_rate
+
+
+def analyse_in_blocks(block_size):
+    analyzer = StreamAnalyzer(sr)
+    results = []
+    for start in range(0, len(y), block_size):
+        results.append(analyzer.process(y[start : start + block_size]))
+    results.append(analyzer.finish())
+    return {
+        name: np.concatenate([result[name] for result in results], axis=-1)
+        for name in results[0]
+    }
+
+
+streamed = analyse_in_blocks(1000)
+S = np.abs(librosa.stft(y))
+log_mel = librosa.power_to_db(
+    librosa.feature.melspectrogram(S=S**2, sr=sr), top_db=None
+)
+
+
+def test_frame_count():
+    assert streamed['centroid'].shape == (1, S.shape[1])
+    assert streamed['onset_envelope'].shape == (S.shape[1],)
+
+
+def test_centroid():
+    centroids = librosa.feature.spectral_centroid(S=S, sr=sr)
+    assert np.allclose(streamed['centroid'], centroids, rtol=1e-4)
+
+
+def test_amplitude():
+    amplitudes = librosa.feature.rms(y=y)
+    assert np.allclose(streamed['amplitude'], amplitudes, rtol=1e-4, atol=1e-6)
+
+
+def test_timbre():
+    mfccs = librosa.feature.mfcc(S=log_mel, n_mfcc=12)
+    assert np.allclose(streamed['timbre'], mfccs, rtol=1e-3, atol=1e-2)
+
+
+def test_onset_envelope():
+    onset_env = librosa.onset.onset_strength(S=log_mel, sr=sr)
+    assert np.allclose(streamed['onset_envelope'], onset_env, rtol=1e-3, atol=1e-3)
+
+
+def test_block_size_does_not_matter():
+    other = analyse_in_blocks(4096)
+    for name in streamed:
+        assert np.allclose(streamed[name], other[name], rtol=1e-4, atol=1e-4)
+
+
+stream_audio = Audio(EXAMPLE_FILE, stream=True, block_size=4096)
+
+
+def test_stream_audio_features():
+    amplitude = stream_audio.features['amplitude']
+    assert stream_audio._raw_samples is None
+    assert len(amplitude) == len(audio.features['amplitude'])
+    assert np.allclose(
+        amplitude.data.index.total_seconds(),
+        audio.features['amplitude'].data.index.total_seconds(),
+        atol=1e-3,
+    )
+
+
+def test_stream_audio_timings():
+    beats = stream_audio.timings['beats']
+    assert stream_audio._raw_samples is None
+    assert abs(len(beats) - len(audio.timings['beats'])) <= 1
+
+
+def test_stream_audio_raw_samples():
+    assert stream_audio.duration == audio.duration
+    assert stream_audio.num_channels == audio.num_channels
+    assert np.allclose(stream_audio.raw_samples, audio.raw_samples)
+
+
+def test_stream_audio_channels():
+    directory = tempfile.mkdtemp()
+    file_path = os.path.join(directory, 'three_channels.wav')
+    samples = np.random.RandomState(0).uniform(-0.5, 0.5, size=(22050, 3))
+    sf.write(file_path, samples, 22050)
+    three_channels = Audio(file_path, stream=True)
+    mono = Audio(file_path, stream=True, convert_to_mono=True)
+    assert three_channels.num_channels == 3
+    assert three_channels.raw_samples.shape[0] == 3
+    assert mono.num_channels == 1
+    assert mono.raw_samples.shape[0] == 1
+    shutil.rmtree(directory)
+
+
+def test_stream_audio_needs_file_path():
+    with pytest.raises(AudioError):
+        Audio(raw_samples=audio.raw_samples, stream=True)
+
+
+def test_stream_audio_cache():
+    directory = tempfile.mkdtemp()
+    first = Audio(EXAMPLE_FILE, stream=True, cache=directory)
+    second = Audio(EXAMPLE_FILE, stream=True, cache=directory)
+    assert len(os.listdir(directory)) == 1
+    shutil.rmtree(directory)
+
+    assert first._raw_samples is None
+    assert second._raw_samples is None
+    assert second._analysis.is_loaded('timbre')
+    assert np.array_equal(first._analysis['timbre'], second._analysis['timbre'])
@@ -79,3 +79,14 @@ def test_synthesize_sample_output_stereo():
     assert np.isclose(
         stereo_audio.raw_samples[0][100], synthesized_audio.raw_samples[0][100]
     )
+
+
+def test_synthesize_keeps_float32():
+    float32_audio = Audio(EXAMPLE_FILE, dtype=np.float32)
+    synthesized_audio = synthesize(float32_audio.timings['beats'])
+    assert synthesized_audio.raw_samples.dtype == np.float32
+    assert np.allclose(
+        synthesized_audio.raw_samples,
+        synthesize(stereo_audio.timings['beats']).raw_samples,
+        atol=1e-6,
+    )
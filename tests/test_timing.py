@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from bisect import bisect_left, bisect_right
+import pickle
 import numpy as np
 import pandas as pd
 import librosa
+import pytest
 from amen.audio import Audio
 from amen.utils import example_audio_file
 from amen.utils import example_mono_audio_file
-from amen.timing import TimeSlice
+from amen.timing import TimeSlice, TimingList, zero_crossing_offsets
+from amen.timing import zero_crossing_plan
 
 t = 5
 d = 10
@@ -120,3 +124,205 @@ def test_get_samples_audio():
 
     stereo_reset_samples, stereo_original_samples = get_samples_audio(stereo_audio)
     assert np.array_equiv(stereo_reset_samples, stereo_original_samples)
+
+
+def test_zero_crossing_offsets_vectorized():
+    zero_index = stereo_audio.zero_indexes[0]
+    starting_samples = np.array([0, 3, 1000, 50000])
+    ending_samples = starting_samples + 4410
+    starting_offsets, ending_offsets = zero_crossing_offsets(
+        zero_index, starting_samples, ending_samples
+    )
+    for i, (start, end) in enumerate(zip(starting_samples, ending_samples)):
+        offsets = zero_crossing_offsets(zero_index, start, end)
+        assert (starting_offsets[i], ending_offsets[i]) == offsets
+        assert start + starting_offsets[i] <= start
+        assert end + ending_offsets[i] >= end
+
+
+def bisect_offsets(zero_index, starting_sample, ending_sample):
+    # The search TimeSlice._get_offsets did before it was vectorized.
+    index = bisect_left(zero_index, starting_sample) - 1
+    if index < 0:
+        starting_offset = 0
+    else:
+        starting_offset = zero_index[index] - starting_sample
+
+    index = bisect_left(zero_index, ending_sample)
+    if index >= len(zero_index):
+        ending_offset = 0
+    else:
+        zci = min(bisect_right(zero_index, ending_sample), len(zero_index) - 1)
+        ending_offset = zero_index[zci] - ending_sample
+    return starting_offset, ending_offset
+
+
+def test_zero_crossing_offsets_match_bisect():
+    zero_index = stereo_audio.zero_indexes[0]
+    first, last = int(zero_index[0]), int(zero_index[-1])
+    boundaries = np.concatenate(
+        [
+            # before the first crossing, and exactly on the first crossings
+            np.arange(0, first + 1),
+            zero_index[:50],
+            # exactly on, and just either side of, crossings through the file
+            zero_index[::97],
+            zero_index[::97] - 1,
+            zero_index[::97] + 1,
+            np.random.RandomState(0).randint(0, last, 500),
+            # on and after the last crossing
+            zero_index[-50:],
+            np.arange(last, last + 100),
+        ]
+    ).astype(np.int64)
+    zero_list = zero_index.tolist()
+    for starting_samples, ending_samples in [
+        (boundaries, boundaries),
+        (boundaries, boundaries + 2205),
+    ]:
+        starting_offsets, ending_offsets = zero_crossing_offsets(
+            zero_index, starting_samples, ending_samples
+        )
+        for i, (start, end) in enumerate(zip(starting_samples, ending_samples)):
+            expected = bisect_offsets(zero_list, int(start), int(end))
+            assert (starting_offsets[i], ending_offsets[i]) == expected
+
+
+def test_zero_crossing_offsets_without_crossings():
+    offsets = zero_crossing_offsets(np.array([], dtype=np.int32), [10, 20], [15, 25])
+    assert offsets[0].tolist() == [0, 0]
+    assert offsets[1].tolist() == [0, 0]
+
+
+def test_time_slice_equality():
+    same = TimeSlice(t, d, stereo_audio)
+    assert same == time_slice
+    assert hash(same) == hash(time_slice)
+    assert TimeSlice(t, d, mono_audio) != time_slice
+    assert TimeSlice(t, d + 1, stereo_audio) != time_slice
+
+
+def test_time_slice_is_small():
+    assert not hasattr(time_slice, '__dict__')
+    time_slice_copy = TimeSlice(t, d, stereo_audio)
+    time_slice_copy.time = pd.to_timedelta(1, 's')
+    assert time_slice_copy.time == pd.to_timedelta(1, 's')
+
+
+def test_time_slice_setters_take_seconds():
+    time_slice_copy = TimeSlice(t, d, stereo_audio)
+    time_slice_copy.time = 1.5
+    time_slice_copy.duration = 2
+    assert time_slice_copy == TimeSlice(1.5, 2, stereo_audio)
+
+
+timings = [(0.5, 0.25), (0.75, 0.5), (1.25, 0.125)]
+
+
+def test_timing_list_arrays():
+    timing_list = TimingList('test', timings, stereo_audio)
+    assert timing_list.starts.dtype == np.int64
+    assert timing_list.starts.tolist() == [500000000, 750000000, 1250000000]
+    assert timing_list.durations.tolist() == [250000000, 500000000, 125000000]
+    with pytest.raises(ValueError):
+        timing_list.starts[0] = 0
+
+    for time_slice, (start, duration) in zip(timing_list, timings):
+        assert time_slice == TimeSlice(start, duration, stereo_audio)
+    assert timing_list[-1] == TimeSlice(1.25, 0.125, stereo_audio)
+    assert isinstance(timing_list[1:], TimingList)
+    assert timing_list[1:].starts.tolist() == [750000000, 1250000000]
+    assert timing_list[[2, 0]] == [timing_list[2], timing_list[0]]
+    assert timing_list[[True, False, True]] == [timing_list[0], timing_list[2]]
+    assert len(timing_list[[]]) == 0
+    with pytest.raises(TypeError):
+        timing_list[1.0]
+
+
+def test_timing_list_units():
+    timing_list = TimingList('test', [(500, 250)], stereo_audio, unit='ms')
+    assert timing_list == TimingList('test', timings[:1], stereo_audio)
+
+
+def test_timing_list_methods():
+    timing_list = TimingList('test', timings, stereo_audio)
+    slices = list(timing_list)
+    extra = TimeSlice(2, 1, mono_audio)
+
+    timing_list.append(extra)
+    assert timing_list[-1].audio is mono_audio
+    timing_list.insert(0, extra)
+    assert timing_list == [extra] + slices + [extra]
+    assert timing_list.pop(0) == extra
+    timing_list.remove(extra)
+    assert timing_list == slices
+
+    timing_list.reverse()
+    assert timing_list == slices[::-1]
+    timing_list.sort(key=lambda time_slice: time_slice.time)
+    assert timing_list == slices
+
+    timing_list[1] = extra
+    assert timing_list[1] == extra
+    timing_list[1:2] = slices[1:]
+    assert len(timing_list) == 4
+    del timing_list[2:]
+    assert timing_list == slices[:2]
+    timing_list += slices[2:]
+    assert timing_list == slices
+    assert timing_list + slices == slices + slices
+    assert slices + timing_list == slices + slices
+    assert timing_list * 2 == slices * 2
+    assert slices[1] in timing_list
+    assert timing_list.index(slices[2]) == 2
+    assert list(reversed(timing_list)) == slices[::-1]
+    timing_list.clear()
+    assert len(timing_list) == 0
+
+
+def test_timing_list_bounds():
+    timing_list = stereo_audio.timings['beats']
+    starts, ends = timing_list.bounds()
+    assert starts.tolist() == [beat.time.value for beat in timing_list]
+    assert ends.tolist() == [(beat.time + beat.duration).value for beat in timing_list]
+
+
+def test_timing_list_pickle():
+    unpickled = pickle.loads(pickle.dumps(stereo_audio.timings['beats']))
+    assert np.array_equal(unpickled.starts, stereo_audio.timings['beats'].starts)
+    assert unpickled[0].audio is unpickled[1].audio
+
+
+def check_sample_plan(time_slices):
+    starting_samples, sample_starts, sample_ends = time_slices.sample_plan()
+    assert sample_starts.shape == sample_ends.shape == (len(time_slices), 2)
+    for i, time_slice in enumerate(time_slices):
+        samples, left_offset, right_offset = time_slice.get_samples()
+        assert sample_starts[i, 0] - starting_samples[i] == left_offset
+        assert sample_starts[i, 1] - starting_samples[i] == right_offset
+        right_channel = 1 if time_slice.audio.num_channels == 2 else 0
+        raw_samples = time_slice.audio.raw_samples
+        assert np.array_equal(
+            raw_samples[0, sample_starts[i, 0] : sample_ends[i, 0]], samples[0]
+        )
+        assert np.array_equal(
+            raw_samples[right_channel, sample_starts[i, 1] : sample_ends[i, 1]],
+            samples[1],
+        )
+
+
+def test_sample_plan_matches_get_samples():
+    mono_file_audio = Audio(EXAMPLE_MONO_FILE)
+    check_sample_plan(stereo_audio.timings['segments'])
+    check_sample_plan(mono_file_audio.timings['beats'])
+
+    mixed = stereo_audio.timings['beats'][::2]
+    mixed.extend(mono_file_audio.timings['beats'][1::2])
+    check_sample_plan(mixed)
+
+
+def test_zero_crossing_plan_from_arrays():
+    beats = stereo_audio.timings['beats']
+    plan = zero_crossing_plan(stereo_audio, beats.starts, beats.durations)
+    for planned, expected in zip(plan, beats.sample_plan()):
+        assert np.array_equal(planned, expected)
@@ -10,3 +10,30 @@ def test_example_audio_file():
     path_array = path.split(os.path.sep)
     set_path = path_array[-2:]
     assert (set_path) == ['example_audio', 'amen.wav']
+
+
+def test_lazy_dict_loads_on_access():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return 'value'
+
+    lazy = amen.utils.LazyDict()
+    lazy.set_lazy('key', loader)
+    assert 'key' in lazy
+    assert not lazy.is_loaded('key')
+    assert calls == []
+
+    assert lazy['key'] == 'value'
+    assert lazy['key'] == 'value'
+    assert lazy.is_loaded('key')
+    assert calls == [1]
+
+
+def test_lazy_dict_items():
+    lazy = amen.utils.LazyDict()
+    lazy['eager'] = 1
+    lazy.set_lazy('lazy', lambda: 2)
+    assert sorted(lazy.keys()) == ['eager', 'lazy']
+    assert sorted(lazy.items()) == [('eager', 1), ('lazy', 2)]